@@ -1,11 +1,19 @@
 """Database setup and queries for Caps Edge."""
 
+import atexit
 import sqlite3
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
 import os
 
+# Bump whenever _run_migrations gains a new step so existing databases
+# re-run the migration path once (tracked via PRAGMA user_version)
+SCHEMA_VERSION = 3
+
 # Database path - use /app/data in Docker, local data/ otherwise
 DATA_DIR = Path(os.environ.get("DATA_DIR", Path(__file__).parent.parent / "data"))
 DB_PATH = DATA_DIR / "caps_edge.db"
@@ -56,171 +64,410 @@ def get_team_info(team_abbr: str) -> dict:
     return NHL_TEAMS.get(team_abbr, {"name": team_abbr, "division": "Unknown", "conference": "Unknown"})
 
 
+# Per-thread cached connections (sqlite3 connections are not thread-safe,
+# so each thread gets its own, opened once and reused for its lifetime)
+_local = threading.local()
+_all_connections = []
+_connections_lock = threading.Lock()
+
+# Schema is created once per process, lazily, on first connection use -
+# importing this module must not touch the database (forked workers, tests)
+_schema_ready = False
+_schema_lock = threading.RLock()
+
+
+def ensure_schema():
+    """Create tables and run migrations once per process."""
+    global _schema_ready
+    with _schema_lock:
+        if _schema_ready:
+            return
+        # Flag before init_db(): it re-enters here via get_connection() on
+        # this thread (the RLock lets it through) and must not recurse.
+        # Other threads block on the lock until init_db() has finished.
+        _schema_ready = True
+        try:
+            init_db()
+        except Exception:
+            _schema_ready = False
+            raise
+
+
+def _close_all_connections():
+    """Close every cached connection at interpreter exit."""
+    with _connections_lock:
+        for conn in _all_connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        _all_connections.clear()
+
+
+atexit.register(_close_all_connections)
+
+
 def get_connection() -> sqlite3.Connection:
-    """Get a database connection with row factory."""
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    """Get the cached per-thread database connection.
+
+    No row_factory: reads go through the shared tuple cursor from
+    _get_cursor() and writes never fetch, so nothing needs the per-row
+    sqlite3.Row wrapper.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        # Autocommit: the sqlite3 module's implicit deferred transactions
+        # add surprise BEGIN/COMMIT pairs around DML; transactions are
+        # driven explicitly via transaction() instead
+        conn = sqlite3.connect(DB_PATH, isolation_level=None)
+        # One-time pragmas: WAL avoids a journal file rewrite per commit,
+        # NORMAL sync skips the extra fsync that FULL pays in WAL mode
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-65536")
+        conn.execute("PRAGMA foreign_keys=ON")
+        _local.conn = conn
+        with _connections_lock:
+            _all_connections.append(conn)
+        ensure_schema()
     return conn
 
 
-def init_db():
-    """Initialize the database schema."""
-    conn = get_connection()
-    cursor = conn.cursor()
+def _get_cursor() -> sqlite3.Cursor:
+    """Shared per-thread cursor, created once per connection.
 
-    # Players table with team info
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS players (
-            player_id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL,
-            position TEXT NOT NULL,
-            jersey_number INTEGER,
-            team_abbr TEXT,
-            team_name TEXT,
-            division TEXT,
-            conference TEXT
-        )
-    """)
+    Returns plain tuples: every internal caller either indexes positionally
+    or zips against cursor.description, so nothing here needs the Row
+    wrapper.
+    """
+    cursor = getattr(_local, "cursor", None)
+    if cursor is None:
+        cursor = get_connection().cursor()
+        _local.cursor = cursor
+    return cursor
 
-    # Player stats table (traditional stats)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS player_stats (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            player_id INTEGER NOT NULL,
-            updated_at DATETIME NOT NULL,
-            games_played INTEGER,
-            avg_toi REAL,
-            goals INTEGER,
-            assists INTEGER,
-            points INTEGER,
-            plus_minus INTEGER,
-            hits INTEGER,
-            pim INTEGER,
-            faceoff_win_pct REAL,
-            shots INTEGER,
-            shots_per_60 REAL,
-            p60 REAL,
-            p60_percentile INTEGER,
-            toi_per_game REAL,
-            toi_per_game_percentile INTEGER,
-            FOREIGN KEY (player_id) REFERENCES players(player_id)
-        )
-    """)
 
-    # Player Edge stats table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS player_edge_stats (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            player_id INTEGER NOT NULL,
-            updated_at DATETIME NOT NULL,
-
-            -- Skating Speed
-            top_speed_mph REAL,
-            top_speed_percentile INTEGER,
-
-            -- Bursts
-            bursts_20_plus INTEGER,
-            bursts_20_percentile INTEGER,
-            bursts_22_plus INTEGER,
-            bursts_22_percentile INTEGER,
-
-            -- Distance
-            distance_per_game_miles REAL,
-            distance_percentile INTEGER,
-
-            -- Zone Time
-            off_zone_time_pct REAL,
-            off_zone_percentile INTEGER,
-            def_zone_time_pct REAL,
-            def_zone_percentile INTEGER,
-            neu_zone_time_pct REAL,
-
-            -- Zone Starts
-            zone_starts_off_pct REAL,
-            zone_starts_percentile INTEGER,
-
-            -- Shot Speed
-            top_shot_speed_mph REAL,
-            shot_speed_percentile INTEGER,
-
-            -- Shots percentile (for shots/60)
-            shots_percentile INTEGER,
-
-            FOREIGN KEY (player_id) REFERENCES players(player_id)
-        )
-    """)
+# Cache generation for read-side lru_caches. Player writers bump it, and the
+# cached readers key on it, so entries from before a write can never be
+# served afterwards - they just age out of the LRU.
+_generation = 0
 
-    # Goalies table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS goalies (
-            player_id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL,
-            jersey_number INTEGER,
-            team_abbr TEXT,
-            team_name TEXT,
-            division TEXT,
-            conference TEXT,
-            games_played INTEGER,
-            wins INTEGER,
-            losses INTEGER,
-            ot_losses INTEGER,
-            shutouts INTEGER,
-            goals_against_avg REAL,
-            save_pct REAL,
-            high_danger_save_pct REAL,
-            gaa_percentile INTEGER,
-            save_pct_percentile INTEGER,
-            hdsv_percentile INTEGER,
-            updated_at DATETIME
-        )
-    """)
 
-    # Metadata table for tracking updates
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS metadata (
-            key TEXT PRIMARY KEY,
-            value TEXT NOT NULL
-        )
-    """)
+def _bump_generation():
+    global _generation
+    _generation += 1
+
+
+# SQL hoisted to module constants so the sqlite3 statement cache (keyed on
+# exact SQL text) reuses compiled statements across scalar and bulk call sites
+_SQL_UPSERT_PLAYER = """
+    INSERT OR REPLACE INTO players (player_id, name, position, jersey_number,
+                                    team_abbr, team_name, division, conference)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_UPSERT_PLAYER_STATS = """
+        INSERT INTO player_stats (
+            player_id, updated_at, games_played, avg_toi, goals, assists,
+            points, plus_minus, hits, blocks, pim, faceoff_win_pct, shots, shots_per_60,
+            p60, p60_percentile, toi_per_game, toi_per_game_percentile
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(player_id) DO UPDATE SET
+            updated_at=excluded.updated_at,
+            games_played=excluded.games_played,
+            avg_toi=excluded.avg_toi,
+            goals=excluded.goals,
+            assists=excluded.assists,
+            points=excluded.points,
+            plus_minus=excluded.plus_minus,
+            hits=excluded.hits,
+            blocks=excluded.blocks,
+            pim=excluded.pim,
+            faceoff_win_pct=excluded.faceoff_win_pct,
+            shots=excluded.shots,
+            shots_per_60=excluded.shots_per_60,
+            p60=excluded.p60,
+            p60_percentile=excluded.p60_percentile,
+            toi_per_game=excluded.toi_per_game,
+            toi_per_game_percentile=excluded.toi_per_game_percentile
+    """
+
+# Writable player_edge_stats columns, in table order. Upsert SQL is generated
+# from this tuple so the column list lives in exactly one place.
+_EDGE_COLS = (
+    "top_speed_mph", "top_speed_percentile",
+    "bursts_20_plus", "bursts_20_percentile",
+    "bursts_22_plus", "bursts_22_percentile",
+    "distance_per_game_miles", "distance_percentile",
+    "off_zone_time_pct", "off_zone_percentile",
+    "def_zone_time_pct", "def_zone_percentile",
+    "neu_zone_time_pct",
+    "zone_starts_off_pct", "zone_starts_percentile",
+    "top_shot_speed_mph", "shot_speed_percentile",
+    "shots_percentile",
+)
+
+
+@lru_cache(maxsize=None)
+def _edge_upsert_sql(cols: tuple) -> str:
+    """Build the edge-stats upsert for a subset of _EDGE_COLS.
+
+    Cached per column subset; the API returns the same few shapes, so this
+    compiles a handful of statements at most.
+    """
+    col_list = "".join(", " + c for c in cols)
+    placeholders = ", ?" * len(cols)
+    sets = "".join(f", {c}=excluded.{c}" for c in cols)
+    return (
+        f"INSERT INTO player_edge_stats (player_id, updated_at{col_list}) "
+        f"VALUES (?, ?{placeholders}) "
+        f"ON CONFLICT(player_id) DO UPDATE SET updated_at=excluded.updated_at{sets}"
+    )
 
-    # Team stats table for Teams view
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS team_stats (
-            team_abbr TEXT PRIMARY KEY,
-            team_name TEXT NOT NULL,
-            division TEXT,
-            conference TEXT,
-            games_played INTEGER,
-            wins INTEGER,
-            losses INTEGER,
-            ot_losses INTEGER,
-            points INTEGER,
-            goals_for INTEGER,
-            goals_against INTEGER,
-            goal_diff INTEGER,
-            pp_pct REAL,
-            pk_pct REAL,
-            weighted_avg_speed REAL,
-            weighted_avg_shot_speed REAL,
-            avg_bursts_per_game REAL,
-            total_hits INTEGER,
-            points_percentile INTEGER,
-            goal_diff_percentile INTEGER,
-            pp_percentile INTEGER,
-            pk_percentile INTEGER,
-            speed_percentile INTEGER,
-            shot_speed_percentile INTEGER,
-            bursts_percentile INTEGER,
-            updated_at DATETIME
-        )
-    """)
 
-    # Run migrations for existing databases
-    _run_migrations(cursor)
+# Full-width variant for the bulk path, where every row carries every column
+_SQL_UPSERT_EDGE_STATS = _edge_upsert_sql(_EDGE_COLS)
 
-    conn.commit()
-    conn.close()
+
+@contextmanager
+def transaction():
+    """Explicit BEGIN IMMEDIATE / COMMIT block.
+
+    Connections run in autocommit (isolation_level=None), so multi-statement
+    writes that must land atomically wrap themselves in this. IMMEDIATE takes
+    the write lock up front rather than upgrading on first write, which
+    avoids mid-transaction SQLITE_BUSY under concurrent writers.
+    """
+    cursor = _get_cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except Exception:
+        cursor.execute("ROLLBACK")
+        raise
+    cursor.execute("COMMIT")
+
+
+@contextmanager
+def bulk_refresh():
+    """Relax durability for the duration of a full data rebuild.
+
+    A crash inside the window loses only rows the next refresh rewrites
+    anyway, so the per-commit fsyncs buy nothing there. The database stays
+    in WAL: journaling keeps crash-consistency for the tables a refresh
+    does not rewrite (metadata, api_cache), and SQLite cannot leave WAL
+    while other connections are open anyway. Restores NORMAL on exit.
+    """
+    conn = get_connection()
+    conn.execute("PRAGMA synchronous=OFF")
+    try:
+        yield
+    finally:
+        conn.execute("PRAGMA synchronous=NORMAL")
+
+
+# Table DDL, shared by init_db() and the clear_all_* rebuild paths. Each
+# statement carries the full current schema so a freshly created (or dropped
+# and recreated) table never depends on the column migrations below.
+
+_SQL_CREATE_PLAYERS = """
+    CREATE TABLE IF NOT EXISTS players (
+        player_id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        position TEXT NOT NULL,
+        jersey_number INTEGER,
+        team_abbr TEXT,
+        team_name TEXT,
+        division TEXT,
+        conference TEXT
+    )
+"""
+
+_SQL_CREATE_PLAYER_STATS = """
+    CREATE TABLE IF NOT EXISTS player_stats (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        player_id INTEGER NOT NULL,
+        updated_at DATETIME NOT NULL,
+        games_played INTEGER,
+        avg_toi REAL,
+        goals INTEGER,
+        assists INTEGER,
+        points INTEGER,
+        plus_minus INTEGER,
+        hits INTEGER,
+        pim INTEGER,
+        faceoff_win_pct REAL,
+        shots INTEGER,
+        shots_per_60 REAL,
+        p60 REAL,
+        p60_percentile INTEGER,
+        toi_per_game REAL,
+        toi_per_game_percentile INTEGER,
+        blocks INTEGER,
+        FOREIGN KEY (player_id) REFERENCES players(player_id)
+    )
+"""
+
+_SQL_CREATE_PLAYER_EDGE_STATS = """
+    CREATE TABLE IF NOT EXISTS player_edge_stats (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        player_id INTEGER NOT NULL,
+        updated_at DATETIME NOT NULL,
+
+        -- Skating Speed
+        top_speed_mph REAL,
+        top_speed_percentile INTEGER,
+
+        -- Bursts
+        bursts_20_plus INTEGER,
+        bursts_20_percentile INTEGER,
+        bursts_22_plus INTEGER,
+        bursts_22_percentile INTEGER,
+
+        -- Distance
+        distance_per_game_miles REAL,
+        distance_percentile INTEGER,
+
+        -- Zone Time
+        off_zone_time_pct REAL,
+        off_zone_percentile INTEGER,
+        def_zone_time_pct REAL,
+        def_zone_percentile INTEGER,
+        neu_zone_time_pct REAL,
+
+        -- Zone Starts
+        zone_starts_off_pct REAL,
+        zone_starts_percentile INTEGER,
+
+        -- Shot Speed
+        top_shot_speed_mph REAL,
+        shot_speed_percentile INTEGER,
+
+        -- Shots percentile (for shots/60)
+        shots_percentile INTEGER,
+
+        FOREIGN KEY (player_id) REFERENCES players(player_id)
+    )
+"""
+
+_SQL_CREATE_GOALIES = """
+    CREATE TABLE IF NOT EXISTS goalies (
+        player_id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        jersey_number INTEGER,
+        team_abbr TEXT,
+        team_name TEXT,
+        division TEXT,
+        conference TEXT,
+        games_played INTEGER,
+        wins INTEGER,
+        losses INTEGER,
+        ot_losses INTEGER,
+        shutouts INTEGER,
+        goals_against_avg REAL,
+        save_pct REAL,
+        high_danger_save_pct REAL,
+        gaa_percentile INTEGER,
+        save_pct_percentile INTEGER,
+        hdsv_percentile INTEGER,
+        updated_at DATETIME
+    )
+"""
+
+_SQL_CREATE_METADATA = """
+    CREATE TABLE IF NOT EXISTS metadata (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    )
+"""
+
+_SQL_CREATE_API_CACHE = """
+    CREATE TABLE IF NOT EXISTS api_cache (
+        cache_key TEXT PRIMARY KEY,
+        payload TEXT NOT NULL,
+        fetched_at DATETIME NOT NULL,
+        etag TEXT
+    )
+"""
+
+_SQL_CREATE_TEAM_STATS = """
+    CREATE TABLE IF NOT EXISTS team_stats (
+        team_abbr TEXT PRIMARY KEY,
+        team_name TEXT NOT NULL,
+        division TEXT,
+        conference TEXT,
+        games_played INTEGER,
+        wins INTEGER,
+        losses INTEGER,
+        ot_losses INTEGER,
+        points INTEGER,
+        goals_for INTEGER,
+        goals_against INTEGER,
+        goal_diff INTEGER,
+        pp_pct REAL,
+        pk_pct REAL,
+        weighted_avg_speed REAL,
+        weighted_avg_shot_speed REAL,
+        avg_bursts_per_game REAL,
+        total_hits INTEGER,
+        total_blocks INTEGER,
+        points_percentile INTEGER,
+        goal_diff_percentile INTEGER,
+        pp_percentile INTEGER,
+        pk_percentile INTEGER,
+        speed_percentile INTEGER,
+        shot_speed_percentile INTEGER,
+        bursts_percentile INTEGER,
+        hits_percentile INTEGER,
+        blocks_percentile INTEGER,
+        updated_at DATETIME
+    )
+"""
+
+# Indexes for the hot filter predicates on the roster queries plus the ux_*
+# unique indexes that cover the JOIN probes and back the upsert-on-conflict
+# writes. Grouped per table so the clear_all_* rebuilds can restore them.
+_SQL_CREATE_PLAYER_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS ix_players_team ON players(team_abbr)",
+    "CREATE INDEX IF NOT EXISTS ix_players_division ON players(division)",
+    "CREATE INDEX IF NOT EXISTS ix_players_conference ON players(conference)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ux_player_stats_pid ON player_stats(player_id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ux_player_edge_stats_pid ON player_edge_stats(player_id)",
+)
+
+_SQL_CREATE_GOALIE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS ix_goalies_team ON goalies(team_abbr)",
+)
+
+
+def init_db():
+    """Initialize the database schema."""
+    cursor = _get_cursor()
+
+    with transaction():
+        cursor.execute(_SQL_CREATE_PLAYERS)
+        cursor.execute(_SQL_CREATE_PLAYER_STATS)
+        cursor.execute(_SQL_CREATE_PLAYER_EDGE_STATS)
+        cursor.execute(_SQL_CREATE_GOALIES)
+        cursor.execute(_SQL_CREATE_METADATA)
+        cursor.execute(_SQL_CREATE_API_CACHE)
+        cursor.execute(_SQL_CREATE_TEAM_STATS)
+
+        # Run migrations for existing databases, but only when the stored
+        # schema version is stale - skips the table_info introspection on
+        # warm databases. Must run before the unique indexes go in: old
+        # databases can hold duplicate stats rows that the migration
+        # dedupes first.
+        cursor.execute("PRAGMA user_version")
+        if cursor.fetchone()[0] < SCHEMA_VERSION:
+            _run_migrations(cursor)
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+        for sql in _SQL_CREATE_PLAYER_INDEXES + _SQL_CREATE_GOALIE_INDEXES:
+            cursor.execute(sql)
 
 
 def _run_migrations(cursor):
@@ -264,122 +511,133 @@ def _run_migrations(cursor):
     if "shots_percentile" not in edge_columns:
         cursor.execute("ALTER TABLE player_edge_stats ADD COLUMN shots_percentile INTEGER")
 
+    # Stats tables keep a single latest row per player; dedupe any strays
+    # before init_db() enforces that with the ux_* unique indexes
+    # (enables upsert-on-conflict)
+    cursor.execute("""
+        DELETE FROM player_stats WHERE id NOT IN (
+            SELECT MAX(id) FROM player_stats GROUP BY player_id
+        )
+    """)
+    cursor.execute("""
+        DELETE FROM player_edge_stats WHERE id NOT IN (
+            SELECT MAX(id) FROM player_edge_stats GROUP BY player_id
+        )
+    """)
+
     # Drop old tables if they exist (no longer needed)
     cursor.execute("DROP TABLE IF EXISTS position_averages")
     cursor.execute("DROP TABLE IF EXISTS league_stats")
 
-    # Check if goalies table exists (for migrations)
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='goalies'")
-    if not cursor.fetchone():
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS goalies (
-                player_id INTEGER PRIMARY KEY,
-                name TEXT NOT NULL,
-                jersey_number INTEGER,
-                team_abbr TEXT,
-                team_name TEXT,
-                division TEXT,
-                conference TEXT,
-                games_played INTEGER,
-                wins INTEGER,
-                losses INTEGER,
-                ot_losses INTEGER,
-                shutouts INTEGER,
-                goals_against_avg REAL,
-                save_pct REAL,
-                high_danger_save_pct REAL,
-                gaa_percentile INTEGER,
-                save_pct_percentile INTEGER,
-                hdsv_percentile INTEGER,
-                updated_at DATETIME
-            )
-        """)
-
-    # Check if team_stats table exists (for migrations)
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='team_stats'")
-    if not cursor.fetchone():
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS team_stats (
-                team_abbr TEXT PRIMARY KEY,
-                team_name TEXT NOT NULL,
-                division TEXT,
-                conference TEXT,
-                games_played INTEGER,
-                wins INTEGER,
-                losses INTEGER,
-                ot_losses INTEGER,
-                points INTEGER,
-                goals_for INTEGER,
-                goals_against INTEGER,
-                goal_diff INTEGER,
-                pp_pct REAL,
-                pk_pct REAL,
-                weighted_avg_speed REAL,
-                weighted_avg_shot_speed REAL,
-                avg_bursts_per_game REAL,
-                total_hits INTEGER,
-                total_blocks INTEGER,
-                points_percentile INTEGER,
-                goal_diff_percentile INTEGER,
-                pp_percentile INTEGER,
-                pk_percentile INTEGER,
-                speed_percentile INTEGER,
-                shot_speed_percentile INTEGER,
-                bursts_percentile INTEGER,
-                hits_percentile INTEGER,
-                blocks_percentile INTEGER,
-                updated_at DATETIME
-            )
-        """)
-    else:
-        # Add new columns if they don't exist
-        cursor.execute("PRAGMA table_info(team_stats)")
-        team_stats_columns = [col[1] for col in cursor.fetchall()]
-        if "total_blocks" not in team_stats_columns:
-            cursor.execute("ALTER TABLE team_stats ADD COLUMN total_blocks INTEGER")
-        if "hits_percentile" not in team_stats_columns:
-            cursor.execute("ALTER TABLE team_stats ADD COLUMN hits_percentile INTEGER")
-        if "blocks_percentile" not in team_stats_columns:
-            cursor.execute("ALTER TABLE team_stats ADD COLUMN blocks_percentile INTEGER")
+    # Check team_stats for new columns (init_db creates the table itself)
+    cursor.execute("PRAGMA table_info(team_stats)")
+    team_stats_columns = [col[1] for col in cursor.fetchall()]
+    if "total_blocks" not in team_stats_columns:
+        cursor.execute("ALTER TABLE team_stats ADD COLUMN total_blocks INTEGER")
+    if "hits_percentile" not in team_stats_columns:
+        cursor.execute("ALTER TABLE team_stats ADD COLUMN hits_percentile INTEGER")
+    if "blocks_percentile" not in team_stats_columns:
+        cursor.execute("ALTER TABLE team_stats ADD COLUMN blocks_percentile INTEGER")
+
+    # api_cache gains an etag column for conditional-GET revalidation (v2)
+    cursor.execute("PRAGMA table_info(api_cache)")
+    cache_columns = [col[1] for col in cursor.fetchall()]
+    if "etag" not in cache_columns:
+        cursor.execute("ALTER TABLE api_cache ADD COLUMN etag TEXT")
+
+    # The points index never served the ranked queries (the CASE-ordered
+    # LEFT JOIN sorts in a temp b-tree either way) and only taxed stats
+    # upserts; drop it from databases that created it (v3)
+    cursor.execute("DROP INDEX IF EXISTS ix_player_stats_points")
 
 
 def get_last_updated() -> Optional[datetime]:
     """Get the last update timestamp."""
-    conn = get_connection()
-    cursor = conn.cursor()
+    cursor = _get_cursor()
     cursor.execute("SELECT value FROM metadata WHERE key = 'last_updated'")
     row = cursor.fetchone()
-    conn.close()
     if row:
-        return datetime.fromisoformat(row["value"])
+        return datetime.fromisoformat(row[0])
     return None
 
 
 def set_last_updated(timestamp: datetime):
     """Set the last update timestamp."""
-    conn = get_connection()
-    cursor = conn.cursor()
+    cursor = _get_cursor()
     cursor.execute("""
         INSERT OR REPLACE INTO metadata (key, value) VALUES ('last_updated', ?)
     """, (timestamp.isoformat(),))
-    conn.commit()
-    conn.close()
+    _bump_generation()
+
+
+def get_metadata(key: str) -> Optional[str]:
+    """Get a metadata value by key."""
+    cursor = _get_cursor()
+    cursor.execute("SELECT value FROM metadata WHERE key = ?", (key,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def set_metadata(key: str, value: str):
+    """Set a metadata value by key."""
+    cursor = _get_cursor()
+    cursor.execute(
+        "INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)",
+        (key, value)
+    )
+
+
+def get_cached_api_response(cache_key: str, max_age_hours: int) -> Optional[str]:
+    """Get a cached API payload, or None if missing or older than max_age_hours."""
+    cursor = _get_cursor()
+    cursor.execute(
+        "SELECT payload, fetched_at FROM api_cache WHERE cache_key = ?",
+        (cache_key,)
+    )
+    row = cursor.fetchone()
+    if row is None:
+        return None
+
+    payload, fetched_at = row
+    from datetime import timedelta
+    if datetime.fromisoformat(fetched_at) < datetime.now() - timedelta(hours=max_age_hours):
+        return None
+    return payload
+
+
+def get_api_cache_entry(cache_key: str) -> Optional[tuple]:
+    """
+    Get (payload, etag) for a cache key regardless of age, or None.
+
+    Used for ETag revalidation, where the server (not a local TTL)
+    decides whether the cached body is still current.
+    """
+    cursor = _get_cursor()
+    cursor.execute(
+        "SELECT payload, etag FROM api_cache WHERE cache_key = ?",
+        (cache_key,)
+    )
+    return cursor.fetchone()
+
+
+def set_cached_api_response(cache_key: str, payload: str, etag: Optional[str] = None):
+    """Store an API payload (and optionally its ETag) for later reuse."""
+    cursor = _get_cursor()
+    cursor.execute("""
+        INSERT OR REPLACE INTO api_cache (cache_key, payload, fetched_at, etag)
+        VALUES (?, ?, ?, ?)
+    """, (cache_key, payload, datetime.now().isoformat(), etag))
 
 
 def upsert_player(player_id: int, name: str, position: str, jersey_number: Optional[int],
                   team_abbr: Optional[str] = None):
     """Insert or update a player."""
-    conn = get_connection()
-    cursor = conn.cursor()
+    cursor = _get_cursor()
 
     # Get team info
     team_info = get_team_info(team_abbr) if team_abbr else {}
 
-    cursor.execute("""
-        INSERT OR REPLACE INTO players (player_id, name, position, jersey_number,
-                                        team_abbr, team_name, division, conference)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
+    cursor.execute(_SQL_UPSERT_PLAYER, (
         player_id,
         name,
         position,
@@ -389,28 +647,20 @@ def upsert_player(player_id: int, name: str, position: str, jersey_number: Optio
         team_info.get("division"),
         team_info.get("conference")
     ))
-    conn.commit()
-    conn.close()
+    _bump_generation()
 
 
-def upsert_player_stats(player_id: int, stats: dict):
-    """Insert or update player stats (keeps only latest)."""
-    conn = get_connection()
-    cursor = conn.cursor()
+def upsert_player_stats(player_id: int, stats: dict, now_iso: Optional[str] = None):
+    """Insert or update player stats (keeps only latest).
 
-    # Delete old stats for this player
-    cursor.execute("DELETE FROM player_stats WHERE player_id = ?", (player_id,))
+    Callers writing many rows can pass a shared now_iso so the timestamp is
+    computed once per batch instead of once per row.
+    """
+    cursor = _get_cursor()
 
-    # Insert new stats
-    cursor.execute("""
-        INSERT INTO player_stats (
-            player_id, updated_at, games_played, avg_toi, goals, assists,
-            points, plus_minus, hits, blocks, pim, faceoff_win_pct, shots, shots_per_60,
-            p60, p60_percentile, toi_per_game, toi_per_game_percentile
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
+    cursor.execute(_SQL_UPSERT_PLAYER_STATS, (
         player_id,
-        datetime.now().isoformat(),
+        now_iso or datetime.now().isoformat(),
         stats.get("games_played"),
         stats.get("avg_toi"),
         stats.get("goals"),
@@ -428,75 +678,145 @@ def upsert_player_stats(player_id: int, stats: dict):
         stats.get("toi_per_game"),
         stats.get("toi_per_game_percentile")
     ))
-    conn.commit()
-    conn.close()
+    _bump_generation()
 
 
-def upsert_player_edge_stats(player_id: int, stats: dict):
-    """Insert or update player Edge stats (keeps only latest)."""
-    conn = get_connection()
-    cursor = conn.cursor()
+def upsert_player_edge_stats(player_id: int, stats: dict, now_iso: Optional[str] = None):
+    """Insert or update player Edge stats (keeps only latest).
 
-    # Delete old stats for this player
-    cursor.execute("DELETE FROM player_edge_stats WHERE player_id = ?", (player_id,))
+    Callers writing many rows can pass a shared now_iso so the timestamp is
+    computed once per batch instead of once per row.
 
-    # Insert new stats
-    cursor.execute("""
-        INSERT INTO player_edge_stats (
-            player_id, updated_at,
-            top_speed_mph, top_speed_percentile,
-            bursts_20_plus, bursts_20_percentile,
-            bursts_22_plus, bursts_22_percentile,
-            distance_per_game_miles, distance_percentile,
-            off_zone_time_pct, off_zone_percentile,
-            def_zone_time_pct, def_zone_percentile,
-            neu_zone_time_pct,
-            zone_starts_off_pct, zone_starts_percentile,
-            top_shot_speed_mph, shot_speed_percentile,
-            shots_percentile
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
+    Only the columns present in stats are written - partial API records
+    skip the NULL binds (and NULL column writes) entirely, and on conflict
+    they leave the absent columns untouched instead of nulling them out.
+    """
+    cursor = _get_cursor()
+
+    cols = tuple(c for c in _EDGE_COLS if c in stats)
+    cursor.execute(_edge_upsert_sql(cols), (
         player_id,
-        datetime.now().isoformat(),
-        stats.get("top_speed_mph"),
-        stats.get("top_speed_percentile"),
-        stats.get("bursts_20_plus"),
-        stats.get("bursts_20_percentile"),
-        stats.get("bursts_22_plus"),
-        stats.get("bursts_22_percentile"),
-        stats.get("distance_per_game_miles"),
-        stats.get("distance_percentile"),
-        stats.get("off_zone_time_pct"),
-        stats.get("off_zone_percentile"),
-        stats.get("def_zone_time_pct"),
-        stats.get("def_zone_percentile"),
-        stats.get("neu_zone_time_pct"),
-        stats.get("zone_starts_off_pct"),
-        stats.get("zone_starts_percentile"),
-        stats.get("top_shot_speed_mph"),
-        stats.get("shot_speed_percentile"),
-        stats.get("shots_percentile")
+        now_iso or datetime.now().isoformat(),
+        *[stats[c] for c in cols]
     ))
-    conn.commit()
-    conn.close()
+    _bump_generation()
 
 
-def clear_all_player_data():
-    """Clear all player data for fresh full refresh."""
+def upsert_players_bulk(players: list):
+    """Insert or update many players in one transaction.
+
+    Args:
+        players: List of dicts with player_id, name, position,
+                 jersey_number, team_abbr keys.
+    """
+    if not players:
+        return
     conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM player_edge_stats")
-    cursor.execute("DELETE FROM player_stats")
-    cursor.execute("DELETE FROM players")
-    conn.commit()
-    conn.close()
+
+    rows = []
+    for p in players:
+        team_abbr = p.get("team_abbr")
+        team_info = get_team_info(team_abbr) if team_abbr else {}
+        rows.append((
+            p["player_id"],
+            p["name"],
+            p["position"],
+            p.get("jersey_number"),
+            team_abbr,
+            team_info.get("name"),
+            team_info.get("division"),
+            team_info.get("conference")
+        ))
+
+    with transaction():
+        conn.executemany(_SQL_UPSERT_PLAYER, rows)
+    _bump_generation()
+
+
+def upsert_player_stats_bulk(items: list):
+    """Insert or update stats for many players in one transaction.
+
+    Args:
+        items: List of (player_id, stats_dict) tuples.
+    """
+    if not items:
+        return
+    conn = get_connection()
+    now_iso = datetime.now().isoformat()
+
+    rows = [(
+        player_id,
+        now_iso,
+        stats.get("games_played"),
+        stats.get("avg_toi"),
+        stats.get("goals"),
+        stats.get("assists"),
+        stats.get("points"),
+        stats.get("plus_minus"),
+        stats.get("hits"),
+        stats.get("blocks"),
+        stats.get("pim"),
+        stats.get("faceoff_win_pct"),
+        stats.get("shots"),
+        stats.get("shots_per_60"),
+        stats.get("p60"),
+        stats.get("p60_percentile"),
+        stats.get("toi_per_game"),
+        stats.get("toi_per_game_percentile")
+    ) for player_id, stats in items]
+
+    with transaction():
+        conn.executemany(_SQL_UPSERT_PLAYER_STATS, rows)
+    _bump_generation()
+
+
+def upsert_player_edge_stats_bulk(items: list):
+    """Insert or update Edge stats for many players in one transaction.
+
+    Args:
+        items: List of (player_id, stats_dict) tuples.
+    """
+    if not items:
+        return
+    conn = get_connection()
+    now_iso = datetime.now().isoformat()
+
+    # One C-level map over the shared column tuple per row instead of 18
+    # separate stats.get(...) calls (each a method lookup plus hash probe)
+    rows = [(player_id, now_iso, *map(stats.get, _EDGE_COLS))
+            for player_id, stats in items]
+
+    with transaction():
+        conn.executemany(_SQL_UPSERT_EDGE_STATS, rows)
+    _bump_generation()
+
+
+def clear_all_player_data():
+    """Clear all player data for fresh full refresh.
+
+    Drops and recreates the tables rather than DELETE FROM: with
+    foreign_keys=ON an unqualified DELETE loses SQLite's truncate
+    optimization and pays a per-row FK check, while DROP is a metadata
+    operation regardless of row count.
+    """
+    cursor = _get_cursor()
+    with transaction():
+        cursor.execute("DROP TABLE IF EXISTS player_edge_stats")
+        cursor.execute("DROP TABLE IF EXISTS player_stats")
+        cursor.execute("DROP TABLE IF EXISTS players")
+        cursor.execute(_SQL_CREATE_PLAYERS)
+        cursor.execute(_SQL_CREATE_PLAYER_STATS)
+        cursor.execute(_SQL_CREATE_PLAYER_EDGE_STATS)
+        for sql in _SQL_CREATE_PLAYER_INDEXES:
+            cursor.execute(sql)
+    _bump_generation()
 
 
 def upsert_goalie(player_id: int, name: str, jersey_number: Optional[int],
-                  team_abbr: Optional[str], stats: dict):
+                  team_abbr: Optional[str], stats: dict,
+                  now_iso: Optional[str] = None):
     """Insert or update a goalie with all stats."""
-    conn = get_connection()
-    cursor = conn.cursor()
+    cursor = _get_cursor()
 
     # Get team info
     team_info = get_team_info(team_abbr) if team_abbr else {}
@@ -527,53 +847,46 @@ def upsert_goalie(player_id: int, name: str, jersey_number: Optional[int],
         stats.get("gaa_percentile"),
         stats.get("save_pct_percentile"),
         stats.get("hdsv_percentile"),
-        datetime.now().isoformat()
+        now_iso or datetime.now().isoformat()
     ))
-    conn.commit()
-    conn.close()
 
 
 def clear_all_goalie_data():
-    """Clear all goalie data for fresh refresh."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM goalies")
-    conn.commit()
-    conn.close()
+    """Clear all goalie data for fresh refresh (drop + recreate, see
+    clear_all_player_data)."""
+    cursor = _get_cursor()
+    with transaction():
+        cursor.execute("DROP TABLE IF EXISTS goalies")
+        cursor.execute(_SQL_CREATE_GOALIES)
+        for sql in _SQL_CREATE_GOALIE_INDEXES:
+            cursor.execute(sql)
 
 
 def get_league_shots_per_60() -> list:
     """Get all shots per 60 for percentile calculation."""
-    conn = get_connection()
-    cursor = conn.cursor()
+    cursor = _get_cursor()
     cursor.execute("""
         SELECT shots_per_60 FROM player_stats
         WHERE games_played >= 10 AND shots_per_60 IS NOT NULL
         ORDER BY shots_per_60
     """)
-    rows = cursor.fetchall()
-    conn.close()
-    return [row["shots_per_60"] for row in rows]
+    return [row[0] for row in cursor.fetchall()]
 
 
 def get_league_p60() -> list:
     """Get all P/60 values for percentile calculation."""
-    conn = get_connection()
-    cursor = conn.cursor()
+    cursor = _get_cursor()
     cursor.execute("""
         SELECT p60 FROM player_stats
         WHERE games_played >= 10 AND p60 IS NOT NULL
         ORDER BY p60
     """)
-    rows = cursor.fetchall()
-    conn.close()
-    return [row["p60"] for row in rows]
+    return [row[0] for row in cursor.fetchall()]
 
 
 def get_league_toi_by_position() -> dict:
     """Get TOI/G values by position (F vs D) for percentile calculation."""
-    conn = get_connection()
-    cursor = conn.cursor()
+    cursor = _get_cursor()
 
     # Get forwards TOI
     cursor.execute("""
@@ -583,7 +896,7 @@ def get_league_toi_by_position() -> dict:
         AND p.position IN ('C', 'L', 'R')
         ORDER BY s.toi_per_game
     """)
-    forwards = [row["toi_per_game"] for row in cursor.fetchall()]
+    forwards = [row[0] for row in cursor.fetchall()]
 
     # Get defensemen TOI
     cursor.execute("""
@@ -593,60 +906,49 @@ def get_league_toi_by_position() -> dict:
         AND p.position = 'D'
         ORDER BY s.toi_per_game
     """)
-    defensemen = [row["toi_per_game"] for row in cursor.fetchall()]
+    defensemen = [row[0] for row in cursor.fetchall()]
 
-    conn.close()
     return {"F": forwards, "D": defensemen}
 
 
 def get_league_goalie_gaa() -> list:
     """Get all GAA values for percentile calculation (lower is better)."""
-    conn = get_connection()
-    cursor = conn.cursor()
+    cursor = _get_cursor()
     cursor.execute("""
         SELECT goals_against_avg FROM goalies
         WHERE games_played >= 10 AND goals_against_avg IS NOT NULL
         ORDER BY goals_against_avg DESC
     """)
-    rows = cursor.fetchall()
-    conn.close()
-    return [row["goals_against_avg"] for row in rows]
+    return [row[0] for row in cursor.fetchall()]
 
 
 def get_league_goalie_save_pct() -> list:
     """Get all save percentage values for percentile calculation."""
-    conn = get_connection()
-    cursor = conn.cursor()
+    cursor = _get_cursor()
     cursor.execute("""
         SELECT save_pct FROM goalies
         WHERE games_played >= 10 AND save_pct IS NOT NULL
         ORDER BY save_pct
     """)
-    rows = cursor.fetchall()
-    conn.close()
-    return [row["save_pct"] for row in rows]
+    return [row[0] for row in cursor.fetchall()]
 
 
 def get_league_goalie_hdsv() -> list:
     """Get all high danger save pct values for percentile calculation."""
-    conn = get_connection()
-    cursor = conn.cursor()
+    cursor = _get_cursor()
     cursor.execute("""
         SELECT high_danger_save_pct FROM goalies
         WHERE games_played >= 10 AND high_danger_save_pct IS NOT NULL
         ORDER BY high_danger_save_pct
     """)
-    rows = cursor.fetchall()
-    conn.close()
-    return [row["high_danger_save_pct"] for row in rows]
+    return [row[0] for row in cursor.fetchall()]
 
 
 def get_goalies_with_stats(team_abbr: Optional[str] = None,
                            division: Optional[str] = None,
                            conference: Optional[str] = None) -> list:
     """Get goalies with stats, optionally filtered by team/division/conference."""
-    conn = get_connection()
-    cursor = conn.cursor()
+    cursor = _get_cursor()
 
     query = """
         SELECT
@@ -673,15 +975,13 @@ def get_goalies_with_stats(team_abbr: Optional[str] = None,
     query += " ORDER BY wins DESC NULLS LAST"
 
     cursor.execute(query, params)
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
+    columns = [d[0] for d in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
 
 
 def get_goalie_by_id(player_id: int) -> Optional[dict]:
     """Get a single goalie with all stats."""
-    conn = get_connection()
-    cursor = conn.cursor()
+    cursor = _get_cursor()
     cursor.execute("""
         SELECT
             player_id, name, jersey_number, team_abbr, team_name,
@@ -692,8 +992,37 @@ def get_goalie_by_id(player_id: int) -> Optional[dict]:
         WHERE player_id = ?
     """, (player_id,))
     row = cursor.fetchone()
-    conn.close()
-    return dict(row) if row else None
+    if row is None:
+        return None
+    return dict(zip([d[0] for d in cursor.description], row))
+
+
+# TOI-weighted average top speed and bursts/game, aggregated per team in
+# SQLite. SUM skips NULL bursts, matching the old Python `or 0` handling.
+_SQL_TEAM_SPEED = """
+    SELECT
+        p.team_abbr,
+        SUM(e.top_speed_mph * s.avg_toi) / SUM(s.avg_toi) AS weighted_avg_speed,
+        CAST(SUM(e.bursts_20_plus) AS REAL) / SUM(s.games_played) AS avg_bursts_per_game,
+        COUNT(*) AS player_count
+    FROM players p
+    JOIN player_edge_stats e ON p.player_id = e.player_id
+    JOIN player_stats s ON p.player_id = s.player_id
+    WHERE e.top_speed_mph IS NOT NULL
+    AND s.avg_toi IS NOT NULL
+    AND s.games_played >= 10
+    {extra_where}
+    GROUP BY p.team_abbr
+"""
+
+
+def _team_speed_row_to_dict(row) -> dict:
+    _, weighted_avg_speed, avg_bursts_per_game, player_count = row
+    return {
+        "weighted_avg_speed": round(weighted_avg_speed or 0, 2),
+        "avg_bursts_per_game": round(avg_bursts_per_game or 0, 2),
+        "player_count": player_count
+    }
 
 
 def get_team_speed_stats(team_abbr: str) -> Optional[dict]:
@@ -705,56 +1034,11 @@ def get_team_speed_stats(team_abbr: str) -> Optional[dict]:
     - avg_bursts_per_game: Average bursts over 20 mph per game
     - player_count: Number of players with speed data
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    # Get players with speed data and TOI
-    cursor.execute("""
-        SELECT
-            e.top_speed_mph,
-            e.bursts_20_plus,
-            s.avg_toi,
-            s.games_played
-        FROM players p
-        JOIN player_edge_stats e ON p.player_id = e.player_id
-        JOIN player_stats s ON p.player_id = s.player_id
-        WHERE p.team_abbr = ?
-        AND e.top_speed_mph IS NOT NULL
-        AND s.avg_toi IS NOT NULL
-        AND s.games_played >= 10
-    """, (team_abbr,))
-
-    rows = cursor.fetchall()
-    conn.close()
-
-    if not rows:
-        return None
-
-    # Calculate TOI-weighted average speed
-    total_toi = 0
-    weighted_speed_sum = 0
-    total_bursts = 0
-    total_games = 0
-
-    for row in rows:
-        toi = row["avg_toi"] or 0
-        speed = row["top_speed_mph"] or 0
-        bursts = row["bursts_20_plus"] or 0
-        games = row["games_played"] or 0
-
-        total_toi += toi
-        weighted_speed_sum += speed * toi
-        total_bursts += bursts
-        total_games += games
-
-    weighted_avg_speed = weighted_speed_sum / total_toi if total_toi > 0 else 0
-    avg_bursts_per_game = total_bursts / total_games if total_games > 0 else 0
-
-    return {
-        "weighted_avg_speed": round(weighted_avg_speed, 2),
-        "avg_bursts_per_game": round(avg_bursts_per_game, 2),
-        "player_count": len(rows)
-    }
+    cursor = _get_cursor()
+    cursor.execute(_SQL_TEAM_SPEED.format(extra_where="AND p.team_abbr = ?"),
+                   (team_abbr,))
+    row = cursor.fetchone()
+    return _team_speed_row_to_dict(row) if row else None
 
 
 def get_all_teams_speed_stats() -> list:
@@ -762,14 +1046,20 @@ def get_all_teams_speed_stats() -> list:
     Get speed stats for all teams for ranking purposes.
 
     Returns list of dicts sorted by weighted_avg_speed descending.
+    Aggregated in a single GROUP BY query instead of one query per team.
     """
+    cursor = _get_cursor()
+    cursor.execute(_SQL_TEAM_SPEED.format(extra_where=""))
+
     results = []
-    for team_abbr in NHL_TEAMS.keys():
-        stats = get_team_speed_stats(team_abbr)
-        if stats:
-            stats["team_abbr"] = team_abbr
-            stats["team_name"] = NHL_TEAMS[team_abbr]["name"]
-            results.append(stats)
+    for row in cursor.fetchall():
+        team_abbr = row[0]
+        if team_abbr not in NHL_TEAMS:
+            continue
+        stats = _team_speed_row_to_dict(row)
+        stats["team_abbr"] = team_abbr
+        stats["team_name"] = NHL_TEAMS[team_abbr]["name"]
+        results.append(stats)
 
     # Sort by weighted average speed (descending)
     results.sort(key=lambda x: x["weighted_avg_speed"], reverse=True)
@@ -817,14 +1107,10 @@ def get_divisions_list() -> list:
     return list(divisions.values())
 
 
-def get_players_with_stats(team_abbr: Optional[str] = None,
-                            division: Optional[str] = None,
-                            conference: Optional[str] = None) -> list:
-    """Get players with stats, optionally filtered by team/division/conference."""
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    query = """
+# Shared SELECT body for the player queries below; each call site appends
+# its own predicate, so all of them share one statement prefix and a
+# column addition happens in a single place
+_PLAYER_SELECT = """
         SELECT
             p.player_id, p.name, p.position, p.jersey_number,
             p.team_abbr, p.team_name, p.division, p.conference,
@@ -846,8 +1132,16 @@ def get_players_with_stats(team_abbr: Optional[str] = None,
         FROM players p
         LEFT JOIN player_stats s ON p.player_id = s.player_id
         LEFT JOIN player_edge_stats e ON p.player_id = e.player_id
-        WHERE p.position != 'G'
-    """
+"""
+
+
+def get_players_with_stats(team_abbr: Optional[str] = None,
+                            division: Optional[str] = None,
+                            conference: Optional[str] = None) -> list:
+    """Get players with stats, optionally filtered by team/division/conference."""
+    cursor = _get_cursor()
+
+    query = _PLAYER_SELECT + " WHERE p.position != 'G'"
 
     params = []
 
@@ -861,12 +1155,11 @@ def get_players_with_stats(team_abbr: Optional[str] = None,
         query += " AND p.conference = ?"
         params.append(conference)
 
-    query += " ORDER BY s.points DESC NULLS LAST"
+    query += " ORDER BY CASE WHEN s.points IS NULL THEN 1 ELSE 0 END, s.points DESC"
 
     cursor.execute(query, params)
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
+    columns = [d[0] for d in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
 
 
 def get_all_players_with_stats() -> list:
@@ -874,43 +1167,28 @@ def get_all_players_with_stats() -> list:
     return get_players_with_stats()
 
 
-def get_player_by_id(player_id: int) -> Optional[dict]:
-    """Get a single player with all stats."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT
-            p.player_id, p.name, p.position, p.jersey_number,
-            p.team_abbr, p.team_name, p.division, p.conference,
-            s.games_played, s.avg_toi, s.goals, s.assists, s.points,
-            s.plus_minus, s.hits, s.blocks, s.pim, s.faceoff_win_pct,
-            s.shots, s.shots_per_60,
-            s.p60, s.p60_percentile,
-            s.toi_per_game, s.toi_per_game_percentile,
-            e.top_speed_mph, e.top_speed_percentile,
-            e.bursts_20_plus, e.bursts_20_percentile,
-            e.bursts_22_plus, e.bursts_22_percentile,
-            e.distance_per_game_miles, e.distance_percentile,
-            e.off_zone_time_pct, e.off_zone_percentile,
-            e.def_zone_time_pct, e.def_zone_percentile,
-            e.neu_zone_time_pct,
-            e.zone_starts_off_pct, e.zone_starts_percentile,
-            e.top_shot_speed_mph, e.shot_speed_percentile,
-            e.shots_percentile
-        FROM players p
-        LEFT JOIN player_stats s ON p.player_id = s.player_id
-        LEFT JOIN player_edge_stats e ON p.player_id = e.player_id
-        WHERE p.player_id = ?
-    """, (player_id,))
+@lru_cache(maxsize=1024)
+def _cached_player(gen: int, player_id: int) -> Optional[dict]:
+    cursor = _get_cursor()
+    cursor.execute(_PLAYER_SELECT + " WHERE p.player_id = ?", (player_id,))
     row = cursor.fetchone()
-    conn.close()
-    return dict(row) if row else None
+    if row is None:
+        return None
+    return dict(zip([d[0] for d in cursor.description], row))
+
 
+def get_player_by_id(player_id: int) -> Optional[dict]:
+    """Get a single player with all stats.
 
-def upsert_team_stats(team_abbr: str, stats: dict):
+    Cached per (generation, player_id): player data only changes at refresh
+    time, so steady-state lookups skip SQLite entirely.
+    """
+    return _cached_player(_generation, player_id)
+
+
+def upsert_team_stats(team_abbr: str, stats: dict, now_iso: Optional[str] = None):
     """Insert or update team stats."""
-    conn = get_connection()
-    cursor = conn.cursor()
+    cursor = _get_cursor()
 
     team_info = get_team_info(team_abbr)
 
@@ -957,17 +1235,14 @@ def upsert_team_stats(team_abbr: str, stats: dict):
         stats.get("bursts_percentile"),
         stats.get("hits_percentile"),
         stats.get("blocks_percentile"),
-        datetime.now().isoformat()
+        now_iso or datetime.now().isoformat()
     ))
-    conn.commit()
-    conn.close()
 
 
 def get_all_team_stats(division: Optional[str] = None,
                        conference: Optional[str] = None) -> list:
     """Get all teams with stats, optionally filtered by division/conference."""
-    conn = get_connection()
-    cursor = conn.cursor()
+    cursor = _get_cursor()
 
     query = """
         SELECT
@@ -997,9 +1272,8 @@ def get_all_team_stats(division: Optional[str] = None,
     query += " ORDER BY points DESC NULLS LAST"
 
     cursor.execute(query, params)
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
+    columns = [d[0] for d in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
 
 
 def get_team_edge_aggregates(team_abbr: str) -> Optional[dict]:
@@ -1013,19 +1287,21 @@ def get_team_edge_aggregates(team_abbr: str) -> Optional[dict]:
     - total_hits: Sum of all player hits
     - total_blocks: Sum of all player blocks
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    cursor = _get_cursor()
 
-    # Get players with Edge data and TOI
+    # Aggregate in SQLite; each TOI-weighted average divides by the TOI of
+    # only the players that have that measurement (the CASE sums), which
+    # mirrors the old row-by-row Python accumulation.
     cursor.execute("""
         SELECT
-            e.top_speed_mph,
-            e.top_shot_speed_mph,
-            e.bursts_20_plus,
-            s.avg_toi,
-            s.games_played,
-            s.hits,
-            s.blocks
+            COUNT(*),
+            SUM(e.top_speed_mph * s.avg_toi) /
+                SUM(CASE WHEN e.top_speed_mph IS NOT NULL THEN s.avg_toi END),
+            SUM(e.top_shot_speed_mph * s.avg_toi) /
+                SUM(CASE WHEN e.top_shot_speed_mph IS NOT NULL THEN s.avg_toi END),
+            CAST(COALESCE(SUM(e.bursts_20_plus), 0) AS REAL) / SUM(s.games_played),
+            COALESCE(SUM(s.hits), 0),
+            COALESCE(SUM(s.blocks), 0)
         FROM players p
         JOIN player_edge_stats e ON p.player_id = e.player_id
         JOIN player_stats s ON p.player_id = s.player_id
@@ -1034,66 +1310,28 @@ def get_team_edge_aggregates(team_abbr: str) -> Optional[dict]:
         AND s.games_played >= 10
     """, (team_abbr,))
 
-    rows = cursor.fetchall()
-    conn.close()
+    (player_count, weighted_avg_speed, weighted_avg_shot_speed,
+     avg_bursts_per_game, total_hits, total_blocks) = cursor.fetchone()
 
-    if not rows:
+    if not player_count:
         return None
 
-    # Calculate TOI-weighted averages
-    total_toi = 0
-    weighted_speed_sum = 0
-    weighted_shot_speed_sum = 0
-    total_bursts = 0
-    total_games = 0
-    total_hits = 0
-    total_blocks = 0
-    speed_toi = 0  # Track TOI only for players with speed data
-    shot_speed_toi = 0  # Track TOI only for players with shot speed data
-
-    for row in rows:
-        toi = row["avg_toi"] or 0
-        speed = row["top_speed_mph"]
-        shot_speed = row["top_shot_speed_mph"]
-        bursts = row["bursts_20_plus"] or 0
-        games = row["games_played"] or 0
-        hits = row["hits"] or 0
-        blocks = row["blocks"] or 0
-
-        total_toi += toi
-        total_bursts += bursts
-        total_games += games
-        total_hits += hits
-        total_blocks += blocks
-
-        if speed is not None:
-            weighted_speed_sum += speed * toi
-            speed_toi += toi
-
-        if shot_speed is not None:
-            weighted_shot_speed_sum += shot_speed * toi
-            shot_speed_toi += toi
-
-    weighted_avg_speed = weighted_speed_sum / speed_toi if speed_toi > 0 else None
-    weighted_avg_shot_speed = weighted_shot_speed_sum / shot_speed_toi if shot_speed_toi > 0 else None
-    avg_bursts_per_game = total_bursts / total_games if total_games > 0 else 0
-
     return {
         "weighted_avg_speed": round(weighted_avg_speed, 2) if weighted_avg_speed else None,
         "weighted_avg_shot_speed": round(weighted_avg_shot_speed, 2) if weighted_avg_shot_speed else None,
-        "avg_bursts_per_game": round(avg_bursts_per_game, 2),
+        "avg_bursts_per_game": round(avg_bursts_per_game or 0, 2),
         "total_hits": total_hits,
         "total_blocks": total_blocks
     }
 
 
 def clear_all_team_stats():
-    """Clear all team stats for fresh refresh."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM team_stats")
-    conn.commit()
-    conn.close()
+    """Clear all team stats for fresh refresh (drop + recreate, see
+    clear_all_player_data)."""
+    cursor = _get_cursor()
+    with transaction():
+        cursor.execute("DROP TABLE IF EXISTS team_stats")
+        cursor.execute(_SQL_CREATE_TEAM_STATS)
 
 
 def get_players_needing_edge_update(player_ids: list, max_age_hours: int = 6) -> list:
@@ -1114,8 +1352,7 @@ def get_players_needing_edge_update(player_ids: list, max_age_hours: int = 6) ->
     if not player_ids:
         return []
 
-    conn = get_connection()
-    cursor = conn.cursor()
+    cursor = _get_cursor()
 
     # Get current Edge stats timestamps
     placeholders = ','.join('?' * len(player_ids))
@@ -1125,8 +1362,7 @@ def get_players_needing_edge_update(player_ids: list, max_age_hours: int = 6) ->
         WHERE player_id IN ({placeholders})
     """, player_ids)
 
-    existing = {row["player_id"]: row["updated_at"] for row in cursor.fetchall()}
-    conn.close()
+    existing = {player_id: updated_at for player_id, updated_at in cursor.fetchall()}
 
     # Calculate cutoff time
     from datetime import datetime, timedelta
@@ -1164,8 +1400,7 @@ def get_goalies_needing_edge_update(player_ids: list, max_age_hours: int = 6) ->
     if not player_ids:
         return []
 
-    conn = get_connection()
-    cursor = conn.cursor()
+    cursor = _get_cursor()
 
     # Get current goalie timestamps
     placeholders = ','.join('?' * len(player_ids))
@@ -1175,8 +1410,7 @@ def get_goalies_needing_edge_update(player_ids: list, max_age_hours: int = 6) ->
         WHERE player_id IN ({placeholders})
     """, player_ids)
 
-    existing = {row["player_id"]: row["updated_at"] for row in cursor.fetchall()}
-    conn.close()
+    existing = {player_id: updated_at for player_id, updated_at in cursor.fetchall()}
 
     # Calculate cutoff time
     from datetime import datetime, timedelta
@@ -1195,6 +1429,3 @@ def get_goalies_needing_edge_update(player_ids: list, max_age_hours: int = 6) ->
 
     return needs_update
 
-
-# Initialize database on import
-init_db()
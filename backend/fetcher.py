@@ -2,10 +2,18 @@
 
 import logging
 import asyncio
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional
 import httpx
+import numpy as np
+import orjson
 from nhlpy import NHLClient
+from nhlpy.http_client import HttpClient
 from nhlpy.api.query.builder import QueryBuilder
 from nhlpy.api.query.filters.game_type import GameTypeQuery
 from nhlpy.api.query.filters.season import SeasonQuery
@@ -22,21 +30,132 @@ NHL_EDGE_BASE_URL = "https://api.nhle.com/stats/rest/en"
 MAX_CONCURRENT_REQUESTS = 10  # Number of parallel requests
 REQUEST_DELAY = 0.1  # Small delay between batches to be respectful
 
+# Skater position groups for positional rankings (defensemen are 'D')
+FORWARD_POSITIONS = ('C', 'L', 'R')
+
 # Minimum games played to be included
 MIN_GAMES_PLAYED = 10
 
+# How long cached team rosters stay fresh (jersey numbers rarely change)
+ROSTER_CACHE_HOURS = 24
+
 # Current season
 CURRENT_SEASON = "20252026"
 
 
+# Shared connection pool for every nhlpy call. nhlpy's own HttpClient opens
+# a throwaway httpx.Client per request, paying a fresh TCP+TLS handshake on
+# each of the dozens of stats/roster calls a refresh makes; keep-alive
+# amortizes that to one handshake per host.
+_http_pool = httpx.Client(
+    timeout=30.0,
+    follow_redirects=True,
+    limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+)
+
+
+class _PooledHttpClient(HttpClient):
+    """Drop-in for nhlpy's HttpClient that routes GETs through _http_pool."""
+
+    def get(self, endpoint, resource: str, query_params: dict = None) -> httpx.Response:
+        full_url = f"{endpoint.value}{resource}"
+        r = _http_pool.get(url=full_url, params=query_params)
+        self._handle_response(r, resource)
+        return r
+
+
+def make_nhl_client() -> NHLClient:
+    """Build an NHLClient whose sub-APIs share the pooled HTTP client."""
+    client = NHLClient(timeout=30)
+    pooled = _PooledHttpClient(client._config)
+    client._http_client = pooled
+    for name in ("teams", "standings", "schedule", "game_center", "stats",
+                 "misc", "helpers", "players", "edge"):
+        getattr(client, name).client = pooled
+    return client
+
+
+@dataclass(slots=True)
+class TraditionalStats:
+    """Per-player traditional stats as fetched; percentiles filled in later.
+
+    Slotted attribute access replaces the dict probes the refresh loops
+    used to make per field; converted back to a dict with asdict() at the
+    database boundary.
+    """
+    games_played: int = 0
+    avg_toi: Optional[float] = None
+    goals: Optional[int] = None
+    assists: Optional[int] = None
+    points: Optional[int] = None
+    plus_minus: Optional[int] = None
+    hits: Optional[int] = None
+    blocks: Optional[int] = None
+    pim: Optional[int] = None
+    faceoff_win_pct: Optional[float] = None
+    shots: Optional[int] = None
+    shots_per_60: Optional[float] = None
+    p60: Optional[float] = None
+    p60_percentile: Optional[int] = None
+    toi_per_game: Optional[float] = None
+    toi_per_game_percentile: Optional[int] = None
+
+
+@dataclass(slots=True)
+class EdgeStats:
+    """Per-player Edge stats as parsed from the three Edge endpoints."""
+    top_speed_mph: Optional[float] = None
+    top_speed_percentile: Optional[int] = None
+    bursts_20_plus: Optional[int] = None
+    bursts_20_percentile: Optional[int] = None
+    bursts_22_plus: Optional[int] = None
+    bursts_22_percentile: Optional[int] = None
+    distance_per_game_miles: Optional[float] = None
+    distance_percentile: Optional[int] = None
+    off_zone_time_pct: Optional[float] = None
+    off_zone_percentile: Optional[int] = None
+    def_zone_time_pct: Optional[float] = None
+    def_zone_percentile: Optional[int] = None
+    neu_zone_time_pct: Optional[float] = None
+    zone_starts_off_pct: Optional[float] = None
+    zone_starts_percentile: Optional[int] = None
+    top_shot_speed_mph: Optional[float] = None
+    shot_speed_percentile: Optional[int] = None
+    shots_percentile: Optional[int] = None
+
+
+@lru_cache(maxsize=2)
+def _season_string(year: int, past_october: bool) -> str:
+    # NHL season starts in October
+    if past_october:
+        return f"{year}{year + 1}"
+    return f"{year - 1}{year}"
+
+
 def get_current_season() -> str:
-    """Get the current NHL season string."""
+    """Get the current NHL season string.
+
+    Memoized on (year, month >= October) so the string formatting runs
+    once per rollover instead of once per caller, while still flipping
+    correctly in long-lived processes.
+    """
     now = datetime.now()
-    # NHL season starts in October
-    if now.month >= 10:
-        return f"{now.year}{now.year + 1}"
-    else:
-        return f"{now.year - 1}{now.year}"
+    return _season_string(now.year, now.month >= 10)
+
+
+@lru_cache(maxsize=8)
+def _query_ctx(season: str, game_type: str = "2"):
+    """
+    Build the nhlpy query context for a season/game type.
+
+    Memoized: the filter objects and context are pure functions of their
+    arguments, and rebuilding them per fetch wastes Pydantic validation.
+    """
+    filters = [
+        SeasonQuery(season_start=season, season_end=season),
+        GameTypeQuery(game_type=game_type),
+    ]
+    return QueryBuilder().build(filters=filters)
 
 
 def calculate_percentile(value: float, sorted_values: list) -> Optional[int]:
@@ -45,15 +164,44 @@ def calculate_percentile(value: float, sorted_values: list) -> Optional[int]:
 
     Returns percentile as integer 0-100.
     """
-    if not sorted_values or value is None:
+    if value is None or len(sorted_values) == 0:
         return None
 
-    # Count how many values are below this value
-    count_below = sum(1 for v in sorted_values if v < value)
+    # The input is sorted, so the count of values below is just the
+    # insertion point. np.searchsorted probes the contiguous array
+    # directly, without boxing elements the way bisect does.
+    count_below = int(np.searchsorted(np.asarray(sorted_values, dtype=float),
+                                      value, side="left"))
     percentile = (count_below / len(sorted_values)) * 100
     return int(round(percentile))
 
 
+def calculate_percentiles_batch(values: list, sorted_values: list) -> list:
+    """
+    Percentile rankings for many values against one sorted population.
+
+    Vectorized counterpart of calculate_percentile: a single
+    np.searchsorted ranks every value in one C-level pass instead of a
+    bisect per player. Missing entries (None in a list, NaN in an
+    ndarray) and an empty population come back as None.
+    """
+    if isinstance(values, np.ndarray):
+        vals = values.astype(float, copy=False)
+    else:
+        vals = np.array([np.nan if v is None else v for v in values], dtype=float)
+
+    out = [None] * len(vals)
+    population = np.asarray(sorted_values, dtype=float)
+    if population.size == 0:
+        return out
+
+    present = ~np.isnan(vals)
+    below = np.searchsorted(population, vals[present], side="left")
+    for i, pct in zip(np.flatnonzero(present), np.rint(below / population.size * 100)):
+        out[i] = int(pct)
+    return out
+
+
 def fetch_team_standings(client: NHLClient) -> dict:
     """
     Fetch current standings for all teams.
@@ -152,6 +300,21 @@ def fetch_team_special_teams(client: NHLClient) -> dict:
         return {}
 
 
+# (source metric, percentile column) pairs ranked across the league in
+# refresh_team_stats; every metric is higher-is-better
+_TEAM_PERCENTILE_METRICS = (
+    ("points", "points_percentile"),
+    ("goal_diff", "goal_diff_percentile"),
+    ("pp_pct", "pp_percentile"),
+    ("pk_pct", "pk_percentile"),
+    ("weighted_avg_speed", "speed_percentile"),
+    ("weighted_avg_shot_speed", "shot_speed_percentile"),
+    ("avg_bursts_per_game", "bursts_percentile"),
+    ("total_hits", "hits_percentile"),
+    ("total_blocks", "blocks_percentile"),
+)
+
+
 def refresh_team_stats(client: NHLClient):
     """
     Refresh all team stats: standings, special teams, and Edge aggregates.
@@ -183,55 +346,74 @@ def refresh_team_stats(client: NHLClient):
         }
         all_team_stats.append({"team_abbr": team_abbr, **team_stats})
 
-    # 5. Calculate percentiles across all teams
-    # Collect values for each metric
-    all_points = [t.get("points") for t in all_team_stats if t.get("points") is not None]
-    all_goal_diff = [t.get("goal_diff") for t in all_team_stats if t.get("goal_diff") is not None]
-    all_pp = [t.get("pp_pct") for t in all_team_stats if t.get("pp_pct") is not None]
-    all_pk = [t.get("pk_pct") for t in all_team_stats if t.get("pk_pct") is not None]
-    all_speed = [t.get("weighted_avg_speed") for t in all_team_stats if t.get("weighted_avg_speed") is not None]
-    all_shot_speed = [t.get("weighted_avg_shot_speed") for t in all_team_stats if t.get("weighted_avg_shot_speed") is not None]
-    all_bursts = [t.get("avg_bursts_per_game") for t in all_team_stats if t.get("avg_bursts_per_game") is not None]
-    all_hits = [t.get("total_hits") for t in all_team_stats if t.get("total_hits") is not None]
-    all_blocks = [t.get("total_blocks") for t in all_team_stats if t.get("total_blocks") is not None]
-
-    # Sort for percentile calculation
-    all_points.sort()
-    all_goal_diff.sort()
-    all_pp.sort()
-    all_pk.sort()
-    all_speed.sort()
-    all_shot_speed.sort()
-    all_bursts.sort()
-    all_hits.sort()
-    all_blocks.sort()
-
-    # 6. Add percentiles and save each team
+    # Cron refreshes usually land between games; when the merged inputs
+    # match the previous run byte for byte, the rankings and all 32
+    # upserts would reproduce what is already stored - skip them.
+    digest = hashlib.sha256(
+        json.dumps(all_team_stats, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    if digest == database.get_metadata("team_stats_digest"):
+        logger.info("Team stats unchanged since last refresh, skipping save")
+        return
+
+    # 5. Rank every metric across the league, table-driven: one pass per
+    # metric collects the population, sorts it once and assigns the
+    # percentile column through a single batched searchsorted, replacing
+    # nine hand-written collect/sort/probe blocks
+    for metric, pct_key in _TEAM_PERCENTILE_METRICS:
+        values = [t.get(metric) for t in all_team_stats]
+        population = np.sort(np.array([v for v in values if v is not None],
+                                      dtype=float))
+        for team_stats, pct in zip(all_team_stats,
+                                   calculate_percentiles_batch(values, population)):
+            if pct is not None:
+                team_stats[pct_key] = pct
+
+    # 6. Save each team (one shared timestamp per batch)
+    now_iso = datetime.now().isoformat()
     for team_stats in all_team_stats:
-        if team_stats.get("points") is not None:
-            team_stats["points_percentile"] = calculate_percentile(team_stats["points"], all_points)
-        if team_stats.get("goal_diff") is not None:
-            team_stats["goal_diff_percentile"] = calculate_percentile(team_stats["goal_diff"], all_goal_diff)
-        if team_stats.get("pp_pct") is not None:
-            team_stats["pp_percentile"] = calculate_percentile(team_stats["pp_pct"], all_pp)
-        if team_stats.get("pk_pct") is not None:
-            team_stats["pk_percentile"] = calculate_percentile(team_stats["pk_pct"], all_pk)
-        if team_stats.get("weighted_avg_speed") is not None:
-            team_stats["speed_percentile"] = calculate_percentile(team_stats["weighted_avg_speed"], all_speed)
-        if team_stats.get("weighted_avg_shot_speed") is not None:
-            team_stats["shot_speed_percentile"] = calculate_percentile(team_stats["weighted_avg_shot_speed"], all_shot_speed)
-        if team_stats.get("avg_bursts_per_game") is not None:
-            team_stats["bursts_percentile"] = calculate_percentile(team_stats["avg_bursts_per_game"], all_bursts)
-        if team_stats.get("total_hits") is not None:
-            team_stats["hits_percentile"] = calculate_percentile(team_stats["total_hits"], all_hits)
-        if team_stats.get("total_blocks") is not None:
-            team_stats["blocks_percentile"] = calculate_percentile(team_stats["total_blocks"], all_blocks)
-
-        database.upsert_team_stats(team_stats["team_abbr"], team_stats)
+        database.upsert_team_stats(team_stats["team_abbr"], team_stats, now_iso=now_iso)
 
+    database.set_metadata("team_stats_digest", digest)
     logger.info(f"Saved stats for {len(all_team_stats)} teams")
 
 
+def _paginate_stats(fetch_page, page_size: int = 100, key: Optional[str] = None):
+    """
+    Pull every row from a paginated stats report.
+
+    Stops on the response's total count (or a short page) instead of a
+    hard-coded offset ceiling, so each report costs exactly as many
+    requests as the league actually fills. The next page's request is
+    submitted to a worker thread before the current page is consumed,
+    so response handling overlaps the following round-trip.
+
+    When ``key`` is given, rows are keyed into a dict on that field as
+    each page lands, instead of accumulating an intermediate list the
+    caller would immediately re-index.
+    """
+    rows = {} if key else []
+    start = 0
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(fetch_page, start)
+        while True:
+            result = future.result()
+            batch = result.get("data", [])
+            total = result.get("total")
+            start += page_size
+            last_page = (not batch or len(batch) < page_size
+                         or (total is not None and start >= total))
+            if not last_page:
+                future = executor.submit(fetch_page, start)
+            if key:
+                rows.update((row[key], row) for row in batch)
+            else:
+                rows.extend(batch)
+            if last_page:
+                break
+    return rows
+
+
 def fetch_all_league_skaters(client: NHLClient) -> list:
     """
     Fetch all NHL skaters with their team info.
@@ -240,31 +422,16 @@ def fetch_all_league_skaters(client: NHLClient) -> list:
         List of player dicts with id, name, position, team_abbr, jersey_number
     """
     logger.info("Fetching all league skaters...")
-    season = get_current_season()
-
-    filters = [
-        SeasonQuery(season_start=season, season_end=season),
-        GameTypeQuery(game_type="2"),
-    ]
-
-    qb = QueryBuilder()
-    query_ctx = qb.build(filters=filters)
+    query_ctx = _query_ctx(get_current_season())
 
     try:
-        # Paginate through all skaters
-        all_skaters = []
-        for start in range(0, 1500, 100):
-            result = client.stats.skater_stats_with_query_context(
-                query_context=query_ctx,
-                report_type="summary",
-                limit=100,
-                start=start
-            )
-            batch = result.get("data", [])
-            if not batch:
-                break
-            all_skaters.extend(batch)
-            logger.info(f"Fetched skater batch: {len(batch)} players (offset {start})")
+        all_skaters = _paginate_stats(lambda start: client.stats.skater_stats_with_query_context(
+            query_context=query_ctx,
+            report_type="summary",
+            limit=100,
+            start=start
+        ))
+        logger.info(f"Fetched {len(all_skaters)} skaters")
 
     except Exception as e:
         logger.error(f"Error fetching league skaters: {e}")
@@ -300,6 +467,10 @@ def fetch_team_rosters(client: NHLClient, team_abbrs: list) -> dict:
     """
     Fetch jersey numbers from team rosters.
 
+    Rosters barely change between refreshes, so each team's jersey map is
+    cached in the database for ROSTER_CACHE_HOURS - a warm refresh makes
+    no roster HTTP calls at all.
+
     Returns:
         Dict mapping player_id to jersey_number
     """
@@ -307,17 +478,30 @@ def fetch_team_rosters(client: NHLClient, team_abbrs: list) -> dict:
     season = get_current_season()
 
     jersey_map = {}
+    fetched = 0
     for team_abbr in team_abbrs:
+        cache_key = f"roster:{season}:{team_abbr}"
+        cached = database.get_cached_api_response(cache_key, ROSTER_CACHE_HOURS)
+        if cached is not None:
+            jersey_map.update({int(pid): num for pid, num in json.loads(cached).items()})
+            continue
+
         try:
             roster = client.teams.team_roster(team_abbr=team_abbr, season=season)
-            for group in ["forwards", "defensemen"]:
-                for player in roster.get(group, []):
-                    jersey_map[player["id"]] = player.get("sweaterNumber")
         except Exception as e:
             logger.warning(f"Error fetching roster for {team_abbr}: {e}")
             continue
 
-    logger.info(f"Got jersey numbers for {len(jersey_map)} players")
+        team_jerseys = {}
+        for group in ["forwards", "defensemen"]:
+            for player in roster.get(group, []):
+                team_jerseys[player["id"]] = player.get("sweaterNumber")
+        jersey_map.update(team_jerseys)
+        database.set_cached_api_response(cache_key, json.dumps(team_jerseys))
+        fetched += 1
+
+    logger.info(f"Got jersey numbers for {len(jersey_map)} players "
+                f"({fetched} rosters fetched, {len(team_abbrs) - fetched} cached)")
     return jersey_map
 
 
@@ -326,51 +510,27 @@ def fetch_traditional_stats(client: NHLClient) -> dict:
     Fetch traditional stats for all league skaters.
 
     Returns:
-        Dict mapping player_id to stats dict
+        Dict mapping player_id to TraditionalStats
     """
     logger.info("Fetching traditional stats for all skaters...")
-    season = get_current_season()
-
-    filters = [
-        SeasonQuery(season_start=season, season_end=season),
-        GameTypeQuery(game_type="2"),
-    ]
-    qb = QueryBuilder()
-    query_ctx = qb.build(filters=filters)
+    query_ctx = _query_ctx(get_current_season())
 
     try:
-        # Paginate through all summary stats
-        all_summary = []
-        for start in range(0, 1500, 100):
-            result = client.stats.skater_stats_with_query_context(
-                query_context=query_ctx,
-                report_type="summary",
-                limit=100,
-                start=start
-            )
-            batch = result.get("data", [])
-            if not batch:
-                break
-            all_summary.extend(batch)
-
-        summary_data = {p["playerId"]: p for p in all_summary}
+        summary_data = _paginate_stats(lambda start: client.stats.skater_stats_with_query_context(
+            query_context=query_ctx,
+            report_type="summary",
+            limit=100,
+            start=start
+        ), key="playerId")
         logger.info(f"Total summary stats: {len(summary_data)} players")
 
-        # Paginate through realtime stats (hits, blocks, etc.)
-        all_realtime = []
-        for start in range(0, 1500, 100):
-            result = client.stats.skater_stats_with_query_context(
-                query_context=query_ctx,
-                report_type="realtime",
-                limit=100,
-                start=start
-            )
-            batch = result.get("data", [])
-            if not batch:
-                break
-            all_realtime.extend(batch)
-
-        realtime_data = {p["playerId"]: p for p in all_realtime}
+        # Realtime stats (hits, blocks, etc.)
+        realtime_data = _paginate_stats(lambda start: client.stats.skater_stats_with_query_context(
+            query_context=query_ctx,
+            report_type="realtime",
+            limit=100,
+            start=start
+        ), key="playerId")
         logger.info(f"Total realtime stats: {len(realtime_data)} players")
 
     except Exception as e:
@@ -396,25 +556,27 @@ def fetch_traditional_stats(client: NHLClient) -> dict:
         if games_played > 0 and avg_toi and avg_toi > 0:
             minutes_played = games_played * avg_toi
             if minutes_played > 0:
-                shots_per_60 = round((shots / minutes_played) * 60, 2)
-                p60 = round((points / minutes_played) * 60, 2)
-
-        stats[player_id] = {
-            "games_played": games_played,
-            "avg_toi": avg_toi,
-            "goals": summary.get("goals"),
-            "assists": summary.get("assists"),
-            "points": points,
-            "plus_minus": summary.get("plusMinus"),
-            "hits": realtime.get("hits"),
-            "blocks": realtime.get("blockedShots"),
-            "pim": summary.get("penaltyMinutes"),
-            "faceoff_win_pct": summary.get("faceoffWinPct"),
-            "shots": shots,
-            "shots_per_60": shots_per_60,
-            "p60": p60,
-            "toi_per_game": toi_per_game
-        }
+                # One division; both rates then reduce to a multiply
+                per_60 = 60 / minutes_played
+                shots_per_60 = round(shots * per_60, 2)
+                p60 = round(points * per_60, 2)
+
+        stats[player_id] = TraditionalStats(
+            games_played=games_played,
+            avg_toi=avg_toi,
+            goals=summary.get("goals"),
+            assists=summary.get("assists"),
+            points=points,
+            plus_minus=summary.get("plusMinus"),
+            hits=realtime.get("hits"),
+            blocks=realtime.get("blockedShots"),
+            pim=summary.get("penaltyMinutes"),
+            faceoff_win_pct=summary.get("faceoffWinPct"),
+            shots=shots,
+            shots_per_60=shots_per_60,
+            p60=p60,
+            toi_per_game=toi_per_game
+        )
 
     logger.info(f"Got traditional stats for {len(stats)} players")
     return stats
@@ -431,9 +593,11 @@ def fetch_all_league_goalies(client: NHLClient) -> list:
     season = get_current_season()
 
     try:
-        # Paginate through all goalies
+        # Paginate until a short page; this endpoint returns a bare list,
+        # so there is no total count to read
         all_goalies = []
-        for start in range(0, 200, 100):
+        start = 0
+        while True:
             batch = client.stats.goalie_stats_summary(
                 start_season=season,
                 end_season=season,
@@ -446,6 +610,9 @@ def fetch_all_league_goalies(client: NHLClient) -> list:
                 break
             all_goalies.extend(batch)
             logger.info(f"Fetched goalie batch: {len(batch)} goalies (offset {start})")
+            if len(batch) < 100:
+                break
+            start += 100
 
     except Exception as e:
         logger.error(f"Error fetching league goalies: {e}")
@@ -480,19 +647,79 @@ def fetch_all_league_goalies(client: NHLClient) -> list:
     return goalies
 
 
-def fetch_goalie_edge_stats(client: NHLClient, player_id: int) -> Optional[dict]:
-    """
-    Fetch Edge stats for a single goalie (high danger save %, jersey number).
+def _to_pct(val) -> Optional[int]:
+    """Convert a 0-1 percentile from the Edge API to an int 0-100."""
+    if val is None:
+        return None
+    return int(round(val * 100))
 
-    Returns:
-        Dict with goalie Edge stats or None if not available
+
+def _share_pct(src: dict, key: str) -> Optional[float]:
+    """Format a 0-1 share (e.g. zone time) as a percentage with one decimal."""
+    val = src.get(key)
+    return round(val * 100, 1) if val else None
+
+
+def _parse_skater_edge(detail: Optional[dict], speed_detail: Optional[dict],
+                       zone_detail: Optional[dict]) -> Optional[EdgeStats]:
     """
-    try:
-        detail = client.edge.goalie_detail(player_id=str(player_id))
-    except Exception as e:
-        logger.warning(f"Error fetching Edge stats for goalie {player_id}: {e}")
+    Parse the three skater Edge payloads (detail, skating-speed detail,
+    zone time) into an EdgeStats record. Shared by the sync and async
+    fetchers so the field mapping lives in one place.
+    """
+    if not detail:
         return None
 
+    # Extract skating speed data
+    skating = detail.get("skatingSpeed", {})
+    speed_max = skating.get("speedMax", {})
+    bursts_20 = skating.get("burstsOver20", {})
+
+    # Extract speed detail for bursts over 22
+    speed_details = speed_detail.get("skatingSpeedDetails", {}) if speed_detail else {}
+    bursts_22 = speed_details.get("burstsOver22", {})
+
+    # Extract distance
+    distance = detail.get("totalDistanceSkated", {})
+
+    # Calculate distance per game
+    player_info = detail.get("player", {})
+    games_played = player_info.get("gamesPlayed", 1)
+    total_distance = distance.get("imperial", 0)
+    distance_per_game = total_distance / games_played if games_played > 0 else 0
+
+    # Extract zone time
+    zone_time = detail.get("zoneTimeDetails", {})
+
+    # Extract zone starts
+    zone_starts = zone_detail.get("zoneStarts", {}) if zone_detail else {}
+
+    # Extract shot speed
+    shot_speed = detail.get("topShotSpeed", {})
+
+    return EdgeStats(
+        top_speed_mph=speed_max.get("imperial"),
+        top_speed_percentile=_to_pct(speed_max.get("percentile")),
+        bursts_20_plus=bursts_20.get("value"),
+        bursts_20_percentile=_to_pct(bursts_20.get("percentile")),
+        bursts_22_plus=bursts_22.get("value"),
+        bursts_22_percentile=_to_pct(bursts_22.get("percentile")),
+        distance_per_game_miles=round(distance_per_game, 2) if distance_per_game else None,
+        distance_percentile=_to_pct(distance.get("percentile")),
+        off_zone_time_pct=_share_pct(zone_time, "offensiveZonePctg"),
+        off_zone_percentile=_to_pct(zone_time.get("offensiveZonePercentile")),
+        def_zone_time_pct=_share_pct(zone_time, "defensiveZonePctg"),
+        def_zone_percentile=_to_pct(zone_time.get("defensiveZonePercentile")),
+        neu_zone_time_pct=_share_pct(zone_time, "neutralZonePctg"),
+        zone_starts_off_pct=_share_pct(zone_starts, "offensiveZoneStartsPctg"),
+        zone_starts_percentile=_to_pct(zone_starts.get("offensiveZoneStartsPctgPercentile")),
+        top_shot_speed_mph=shot_speed.get("imperial"),
+        shot_speed_percentile=_to_pct(shot_speed.get("percentile"))
+    )
+
+
+def _parse_goalie_edge(detail: Optional[dict]) -> Optional[dict]:
+    """Parse a goalie Edge detail payload (high danger save %, jersey number)."""
     if not detail:
         return None
 
@@ -515,6 +742,22 @@ def fetch_goalie_edge_stats(client: NHLClient, player_id: int) -> Optional[dict]
     }
 
 
+def fetch_goalie_edge_stats(client: NHLClient, player_id: int) -> Optional[dict]:
+    """
+    Fetch Edge stats for a single goalie (high danger save %, jersey number).
+
+    Returns:
+        Dict with goalie Edge stats or None if not available
+    """
+    try:
+        detail = client.edge.goalie_detail(player_id=str(player_id))
+    except Exception as e:
+        logger.warning(f"Error fetching Edge stats for goalie {player_id}: {e}")
+        return None
+
+    return _parse_goalie_edge(detail)
+
+
 def fetch_edge_stats(client: NHLClient, player_id: int) -> Optional[dict]:
     """
     Fetch Edge stats for a single player.
@@ -536,64 +779,37 @@ def fetch_edge_stats(client: NHLClient, player_id: int) -> Optional[dict]:
         logger.warning(f"Error fetching Edge stats for player {player_id}: {e}")
         return None
 
-    if not detail:
-        return None
-
-    # Extract skating speed data
-    skating = detail.get("skatingSpeed", {})
-    speed_max = skating.get("speedMax", {})
-    bursts_20 = skating.get("burstsOver20", {})
-
-    # Extract speed detail for bursts over 22
-    speed_details = speed_detail.get("skatingSpeedDetails", {}) if speed_detail else {}
-    bursts_22 = speed_details.get("burstsOver22", {})
+    stats = _parse_skater_edge(detail, speed_detail, zone_detail)
+    return asdict(stats) if stats else None
 
-    # Extract distance
-    distance = detail.get("totalDistanceSkated", {})
 
-    # Calculate distance per game
-    player_info = detail.get("player", {})
-    games_played = player_info.get("gamesPlayed", 1)
-    total_distance = distance.get("imperial", 0)
-    distance_per_game = total_distance / games_played if games_played > 0 else 0
-
-    # Extract zone time
-    zone_time = detail.get("zoneTimeDetails", {})
-
-    # Extract zone starts
-    zone_starts = zone_detail.get("zoneStarts", {}) if zone_detail else {}
-
-    # Extract shot speed
-    shot_speed = detail.get("topShotSpeed", {})
+async def _get_edge_json(client: httpx.AsyncClient, url: str) -> Optional[dict]:
+    """
+    GET an Edge endpoint with ETag revalidation through the api_cache table.
 
-    # Convert percentiles from decimal (0-1) to int (0-100)
-    def to_pct(val):
-        if val is None:
-            return None
-        return int(round(val * 100))
+    If a previous response carried an ETag, it is sent back as
+    If-None-Match; a 304 reuses the stored body, so refreshes where
+    nothing changed upstream cost a header exchange instead of a full
+    payload. Responses without an ETag behave like a plain GET. orjson
+    decodes the dict-heavy bodies noticeably faster than stdlib json.
+    """
+    cache_key = f"etag:{url}"
+    cached = database.get_api_cache_entry(cache_key)
+    headers = {"If-None-Match": cached[1]} if cached and cached[1] else None
+
+    resp = await client.get(url, headers=headers)
+    if resp.status_code == 304 and cached:
+        return orjson.loads(cached[0])
+    if resp.status_code != 200:
+        return None
 
-    return {
-        "top_speed_mph": speed_max.get("imperial"),
-        "top_speed_percentile": to_pct(speed_max.get("percentile")),
-        "bursts_20_plus": bursts_20.get("value"),
-        "bursts_20_percentile": to_pct(bursts_20.get("percentile")),
-        "bursts_22_plus": bursts_22.get("value"),
-        "bursts_22_percentile": to_pct(bursts_22.get("percentile")),
-        "distance_per_game_miles": round(distance_per_game, 2) if distance_per_game else None,
-        "distance_percentile": to_pct(distance.get("percentile")),
-        "off_zone_time_pct": round(zone_time.get("offensiveZonePctg", 0) * 100, 1) if zone_time.get("offensiveZonePctg") else None,
-        "off_zone_percentile": to_pct(zone_time.get("offensiveZonePercentile")),
-        "def_zone_time_pct": round(zone_time.get("defensiveZonePctg", 0) * 100, 1) if zone_time.get("defensiveZonePctg") else None,
-        "def_zone_percentile": to_pct(zone_time.get("defensiveZonePercentile")),
-        "neu_zone_time_pct": round(zone_time.get("neutralZonePctg", 0) * 100, 1) if zone_time.get("neutralZonePctg") else None,
-        "zone_starts_off_pct": round(zone_starts.get("offensiveZoneStartsPctg", 0) * 100, 1) if zone_starts.get("offensiveZoneStartsPctg") else None,
-        "zone_starts_percentile": to_pct(zone_starts.get("offensiveZoneStartsPctgPercentile")),
-        "top_shot_speed_mph": shot_speed.get("imperial"),
-        "shot_speed_percentile": to_pct(shot_speed.get("percentile"))
-    }
+    etag = resp.headers.get("etag")
+    if etag:
+        database.set_cached_api_response(cache_key, resp.text, etag)
+    return orjson.loads(resp.content)
 
 
-async def async_fetch_edge_stats(client: httpx.AsyncClient, player_id: int) -> Optional[dict]:
+async def async_fetch_edge_stats(client: httpx.AsyncClient, player_id: int) -> Optional[EdgeStats]:
     """
     Async version of fetch_edge_stats using httpx.
 
@@ -606,78 +822,22 @@ async def async_fetch_edge_stats(client: httpx.AsyncClient, player_id: int) -> O
     zone_url = f"{base_url}/edge/skater-zone-time/{player_id}/now"
 
     try:
-        # Make all 3 requests in parallel
-        detail_resp, speed_resp, zone_resp = await asyncio.gather(
-            client.get(detail_url),
-            client.get(speed_url),
-            client.get(zone_url),
-            return_exceptions=True
+        # Make all 3 requests in parallel (handle errors gracefully)
+        detail, speed_detail, zone_detail = (
+            None if isinstance(r, Exception) else r
+            for r in await asyncio.gather(
+                _get_edge_json(client, detail_url),
+                _get_edge_json(client, speed_url),
+                _get_edge_json(client, zone_url),
+                return_exceptions=True
+            )
         )
 
-        # Parse responses (handle errors gracefully)
-        detail = detail_resp.json() if not isinstance(detail_resp, Exception) and detail_resp.status_code == 200 else None
-        speed_detail = speed_resp.json() if not isinstance(speed_resp, Exception) and speed_resp.status_code == 200 else None
-        zone_detail = zone_resp.json() if not isinstance(zone_resp, Exception) and zone_resp.status_code == 200 else None
-
     except Exception as e:
         logger.warning(f"Error fetching async Edge stats for player {player_id}: {e}")
         return None
 
-    if not detail:
-        return None
-
-    # Extract skating speed data
-    skating = detail.get("skatingSpeed", {})
-    speed_max = skating.get("speedMax", {})
-    bursts_20 = skating.get("burstsOver20", {})
-
-    # Extract speed detail for bursts over 22
-    speed_details = speed_detail.get("skatingSpeedDetails", {}) if speed_detail else {}
-    bursts_22 = speed_details.get("burstsOver22", {})
-
-    # Extract distance
-    distance = detail.get("totalDistanceSkated", {})
-
-    # Calculate distance per game
-    player_info = detail.get("player", {})
-    games_played = player_info.get("gamesPlayed", 1)
-    total_distance = distance.get("imperial", 0)
-    distance_per_game = total_distance / games_played if games_played > 0 else 0
-
-    # Extract zone time
-    zone_time = detail.get("zoneTimeDetails", {})
-
-    # Extract zone starts
-    zone_starts = zone_detail.get("zoneStarts", {}) if zone_detail else {}
-
-    # Extract shot speed
-    shot_speed = detail.get("topShotSpeed", {})
-
-    # Convert percentiles from decimal (0-1) to int (0-100)
-    def to_pct(val):
-        if val is None:
-            return None
-        return int(round(val * 100))
-
-    return {
-        "top_speed_mph": speed_max.get("imperial"),
-        "top_speed_percentile": to_pct(speed_max.get("percentile")),
-        "bursts_20_plus": bursts_20.get("value"),
-        "bursts_20_percentile": to_pct(bursts_20.get("percentile")),
-        "bursts_22_plus": bursts_22.get("value"),
-        "bursts_22_percentile": to_pct(bursts_22.get("percentile")),
-        "distance_per_game_miles": round(distance_per_game, 2) if distance_per_game else None,
-        "distance_percentile": to_pct(distance.get("percentile")),
-        "off_zone_time_pct": round(zone_time.get("offensiveZonePctg", 0) * 100, 1) if zone_time.get("offensiveZonePctg") else None,
-        "off_zone_percentile": to_pct(zone_time.get("offensiveZonePercentile")),
-        "def_zone_time_pct": round(zone_time.get("defensiveZonePctg", 0) * 100, 1) if zone_time.get("defensiveZonePctg") else None,
-        "def_zone_percentile": to_pct(zone_time.get("defensiveZonePercentile")),
-        "neu_zone_time_pct": round(zone_time.get("neutralZonePctg", 0) * 100, 1) if zone_time.get("neutralZonePctg") else None,
-        "zone_starts_off_pct": round(zone_starts.get("offensiveZoneStartsPctg", 0) * 100, 1) if zone_starts.get("offensiveZoneStartsPctg") else None,
-        "zone_starts_percentile": to_pct(zone_starts.get("offensiveZoneStartsPctgPercentile")),
-        "top_shot_speed_mph": shot_speed.get("imperial"),
-        "shot_speed_percentile": to_pct(shot_speed.get("percentile"))
-    }
+    return _parse_skater_edge(detail, speed_detail, zone_detail)
 
 
 async def async_fetch_goalie_edge_stats(client: httpx.AsyncClient, player_id: int) -> Optional[dict]:
@@ -687,125 +847,86 @@ async def async_fetch_goalie_edge_stats(client: httpx.AsyncClient, player_id: in
     url = f"https://api-web.nhle.com/v1/edge/goalie-detail/{player_id}/now"
 
     try:
-        resp = await client.get(url)
-        if resp.status_code != 200:
-            return None
-        detail = resp.json()
+        detail = await _get_edge_json(client, url)
     except Exception as e:
         logger.warning(f"Error fetching async Edge stats for goalie {player_id}: {e}")
         return None
 
-    if not detail:
-        return None
+    return _parse_goalie_edge(detail)
 
-    # Extract jersey number from player info
-    player_info = detail.get("player", {})
-    jersey_number = player_info.get("sweaterNumber")
-
-    # Extract high danger save percentage from shotLocationSummary
-    high_danger_save_pct = None
-    shot_locations = detail.get("shotLocationSummary", [])
-    for location in shot_locations:
-        if location.get("locationCode") == "high":
-            high_danger_save_pct = location.get("savePctg")
-            break
 
-    return {
-        "high_danger_save_pct": high_danger_save_pct,
-        "jersey_number": jersey_number,
-    }
-
-
-async def fetch_edge_stats_batch(player_ids: list, progress_callback=None) -> dict:
+async def _gather_edge_batch(player_ids: list, fetch_one, progress_callback=None,
+                             label: str = "players") -> dict:
     """
-    Fetch Edge stats for multiple players in parallel batches.
+    Run per-player Edge fetches under a shared concurrency cap.
 
-    Args:
-        player_ids: List of player IDs to fetch
-        progress_callback: Optional callback(completed, total) for progress updates
-
-    Returns:
-        Dict mapping player_id to Edge stats
+    One gather guarded by a semaphore keeps all MAX_CONCURRENT_REQUESTS
+    slots busy the whole time; the old fixed-size batches stalled every
+    slot whenever one response in the batch was slow.
     """
     results = {}
     total = len(player_ids)
-
-    if total == 0:
-        return results
-
-    logger.info(f"Fetching Edge stats for {total} players in parallel (batch size: {MAX_CONCURRENT_REQUESTS})")
+    completed = 0
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
 
     async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-        # Process in batches
-        for i in range(0, total, MAX_CONCURRENT_REQUESTS):
-            batch = player_ids[i:i + MAX_CONCURRENT_REQUESTS]
-
-            # Fetch batch in parallel
-            tasks = [async_fetch_edge_stats(client, pid) for pid in batch]
-            batch_results = await asyncio.gather(*tasks)
-
-            # Store results
-            for pid, result in zip(batch, batch_results):
-                if result:
-                    results[pid] = result
-
-            # Progress update
-            completed = min(i + len(batch), total)
+        async def worker(pid):
+            nonlocal completed
+            async with semaphore:
+                result = await fetch_one(client, pid)
+                # Hold the slot briefly before releasing to stay respectful
+                await asyncio.sleep(REQUEST_DELAY)
+            completed += 1
+            if result:
+                results[pid] = result
             if progress_callback:
                 progress_callback(completed, total)
             elif completed % 50 == 0 or completed == total:
-                logger.info(f"Edge stats progress: {completed}/{total} players")
+                logger.info(f"Edge stats progress: {completed}/{total} {label}")
 
-            # Small delay between batches to be respectful
-            if i + MAX_CONCURRENT_REQUESTS < total:
-                await asyncio.sleep(REQUEST_DELAY)
+        await asyncio.gather(*(worker(pid) for pid in player_ids))
 
     return results
 
 
-async def fetch_goalie_edge_stats_batch(player_ids: list, progress_callback=None) -> dict:
+async def fetch_edge_stats_batch(player_ids: list, progress_callback=None) -> dict:
     """
-    Fetch Edge stats for multiple goalies in parallel batches.
+    Fetch Edge stats for multiple players in parallel.
 
     Args:
-        player_ids: List of goalie player IDs to fetch
+        player_ids: List of player IDs to fetch
         progress_callback: Optional callback(completed, total) for progress updates
 
     Returns:
-        Dict mapping player_id to goalie Edge stats
+        Dict mapping player_id to Edge stats
     """
-    results = {}
-    total = len(player_ids)
-
-    if total == 0:
-        return results
-
-    logger.info(f"Fetching Edge stats for {total} goalies in parallel")
+    if not player_ids:
+        return {}
 
-    async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-        # Process in batches
-        for i in range(0, total, MAX_CONCURRENT_REQUESTS):
-            batch = player_ids[i:i + MAX_CONCURRENT_REQUESTS]
+    logger.info(f"Fetching Edge stats for {len(player_ids)} players "
+                f"(max {MAX_CONCURRENT_REQUESTS} in flight)")
+    return await _gather_edge_batch(player_ids, async_fetch_edge_stats,
+                                    progress_callback)
 
-            # Fetch batch in parallel
-            tasks = [async_fetch_goalie_edge_stats(client, pid) for pid in batch]
-            batch_results = await asyncio.gather(*tasks)
 
-            # Store results
-            for pid, result in zip(batch, batch_results):
-                if result:
-                    results[pid] = result
+async def fetch_goalie_edge_stats_batch(player_ids: list, progress_callback=None) -> dict:
+    """
+    Fetch Edge stats for multiple goalies in parallel.
 
-            # Progress update
-            completed = min(i + len(batch), total)
-            if progress_callback:
-                progress_callback(completed, total)
+    Args:
+        player_ids: List of goalie player IDs to fetch
+        progress_callback: Optional callback(completed, total) for progress updates
 
-            # Small delay between batches
-            if i + MAX_CONCURRENT_REQUESTS < total:
-                await asyncio.sleep(REQUEST_DELAY)
+    Returns:
+        Dict mapping player_id to goalie Edge stats
+    """
+    if not player_ids:
+        return {}
 
-    return results
+    logger.info(f"Fetching Edge stats for {len(player_ids)} goalies "
+                f"(max {MAX_CONCURRENT_REQUESTS} in flight)")
+    return await _gather_edge_batch(player_ids, async_fetch_goalie_edge_stats,
+                                    progress_callback, label="goalies")
 
 
 def refresh_data():
@@ -815,8 +936,16 @@ def refresh_data():
     Returns:
         Number of players updated
     """
+    # Full-rebuild window: every row written here is rewritten on the next
+    # refresh, so relax durability pragmas while it runs
+    with database.bulk_refresh():
+        return _refresh_data()
+
+
+def _refresh_data():
+    """Refresh body; runs inside the bulk_refresh pragma window."""
     logger.info("Starting full league data refresh...")
-    client = NHLClient()
+    client = make_nhl_client()
 
     # 1. Get all league skaters with 10+ games
     all_skaters = fetch_all_league_skaters(client)
@@ -831,64 +960,80 @@ def refresh_data():
     unique_teams = list(set(p["team_abbr"] for p in all_skaters if p["team_abbr"]))
     jersey_map = fetch_team_rosters(client, unique_teams)
 
-    # 4. Collect all P/60 and TOI values for percentile calculation
-    all_p60 = []
-    forward_toi = []
-    defensemen_toi = []
-
-    for player in all_skaters:
-        player_id = player["player_id"]
-        if player_id in trad_stats:
-            trad = trad_stats[player_id]
-            if trad.get("p60") is not None:
-                all_p60.append(trad["p60"])
-            if trad.get("toi_per_game") is not None:
-                if player["position"] in ['C', 'L', 'R']:
-                    forward_toi.append(trad["toi_per_game"])
-                elif player["position"] == 'D':
-                    defensemen_toi.append(trad["toi_per_game"])
-
-    # Sort for percentile calculation
-    all_p60.sort()
-    forward_toi.sort()
-    defensemen_toi.sort()
+    # 4. Build columnar arrays over the skaters that have stats: position
+    # plus P/60, TOI/G and shots/60 aligned by index (missing values as
+    # NaN). The percentile populations and the ranking passes below all
+    # read from these columns instead of re-walking the list of dicts.
+    with_stats = [(p["player_id"], p["position"], trad_stats[p["player_id"]])
+                  for p in all_skaters if p["player_id"] in trad_stats]
+
+    # Pre-size one (N, 3) block and fill it by index in a single pass
+    # rather than one list comprehension per column
+    stat_cols = np.full((len(with_stats), 3), np.nan)
+    for i, (_, _, trad) in enumerate(with_stats):
+        if trad.p60 is not None:
+            stat_cols[i, 0] = trad.p60
+        if trad.toi_per_game is not None:
+            stat_cols[i, 1] = trad.toi_per_game
+        if trad.shots_per_60 is not None:
+            stat_cols[i, 2] = trad.shots_per_60
+    p60_col, toi_col, shots_col = stat_cols.T
+
+    positions = np.array([pos for _, pos, _ in with_stats])
+
+    is_forward = np.isin(positions, FORWARD_POSITIONS)
+    is_defense = positions == 'D'
+
+    # Sorted populations for percentile calculation
+    all_p60 = np.sort(p60_col[~np.isnan(p60_col)])
+    forward_toi = np.sort(toi_col[is_forward & ~np.isnan(toi_col)])
+    defensemen_toi = np.sort(toi_col[is_defense & ~np.isnan(toi_col)])
+    all_shots_per_60 = np.sort(shots_col[~np.isnan(shots_col)])
 
     logger.info(f"P/60 samples: {len(all_p60)}, Forward TOI samples: {len(forward_toi)}, D TOI samples: {len(defensemen_toi)}")
 
-    # 5. Save all players to database with percentiles
+    # 5. Save all players to database with percentiles, batched so the
+    # whole roster lands in two executemany transactions instead of one
+    # commit per player
     logger.info(f"Saving {len(all_skaters)} players to database...")
-    for player in all_skaters:
-        player_id = player["player_id"]
+    player_rows = [{
+        "player_id": player["player_id"],
+        "name": player["name"],
+        "position": player["position"],
         # Get jersey number from roster data
-        jersey_number = jersey_map.get(player_id, player.get("jersey_number"))
-
-        database.upsert_player(
-            player_id=player_id,
-            name=player["name"],
-            position=player["position"],
-            jersey_number=jersey_number,
-            team_abbr=player.get("team_abbr")
-        )
-
-        # Calculate and add percentiles to traditional stats
-        if player_id in trad_stats:
-            trad = trad_stats[player_id]
-
-            # P/60 percentile (all skaters)
-            if trad.get("p60") is not None:
-                trad["p60_percentile"] = calculate_percentile(trad["p60"], all_p60)
-
-            # TOI/G percentile (by position)
-            if trad.get("toi_per_game") is not None:
-                if player["position"] in ['C', 'L', 'R']:
-                    trad["toi_per_game_percentile"] = calculate_percentile(trad["toi_per_game"], forward_toi)
-                elif player["position"] == 'D':
-                    trad["toi_per_game_percentile"] = calculate_percentile(trad["toi_per_game"], defensemen_toi)
-
-            database.upsert_player_stats(player_id, trad)
-
-    # 6. Fetch Edge stats - with caching and parallel requests
-    all_player_ids = [p["player_id"] for p in all_skaters]
+        "jersey_number": jersey_map.get(player["player_id"], player.get("jersey_number")),
+        "team_abbr": player.get("team_abbr")
+    } for player in all_skaters]
+
+    # Rank the whole league in three vectorized passes (P/60 for all
+    # skaters, TOI/G within each position group) straight off the columns
+    p60_pcts = calculate_percentiles_batch(p60_col, all_p60)
+    fwd_toi_pcts = calculate_percentiles_batch(
+        np.where(is_forward, toi_col, np.nan), forward_toi)
+    def_toi_pcts = calculate_percentiles_batch(
+        np.where(is_defense, toi_col, np.nan), defensemen_toi)
+
+    stats_rows = []
+    for (player_id, _, trad), p60_pct, fwd_pct, def_pct in zip(
+            with_stats, p60_pcts, fwd_toi_pcts, def_toi_pcts):
+        if p60_pct is not None:
+            trad.p60_percentile = p60_pct
+        if fwd_pct is not None or def_pct is not None:
+            trad.toi_per_game_percentile = fwd_pct if fwd_pct is not None else def_pct
+        stats_rows.append((player_id, asdict(trad)))
+
+    database.upsert_players_bulk(player_rows)
+    database.upsert_player_stats_bulk(stats_rows)
+
+    # 6. Fetch Edge stats - with caching and parallel requests. Apply the
+    # same games-played threshold the goalie path already uses: Edge pages
+    # for sub-threshold skaters are mostly empty, and each one skipped
+    # saves three HTTP calls.
+    all_player_ids = [
+        p["player_id"] for p in all_skaters
+        if p["player_id"] in trad_stats
+        and trad_stats[p["player_id"]].games_played >= MIN_GAMES_PLAYED
+    ]
 
     # Check which players need Edge stats update (stale or missing)
     players_needing_update = database.get_players_needing_edge_update(all_player_ids, max_age_hours=6)
@@ -906,45 +1051,33 @@ def refresh_data():
         logger.info("All Edge stats are fresh, no fetching needed")
         edge_stats = {}
 
-    # 7. Collect values for percentile calculation
-    all_shots_per_60 = []
-    all_distance_per_game = []
-    for player in all_skaters:
-        player_id = player["player_id"]
-        if player_id in trad_stats:
-            shots_per_60 = trad_stats[player_id].get("shots_per_60")
-            if shots_per_60 is not None:
-                all_shots_per_60.append(shots_per_60)
-        if player_id in edge_stats:
-            dist_per_game = edge_stats[player_id].get("distance_per_game_miles")
-            if dist_per_game is not None:
-                all_distance_per_game.append(dist_per_game)
-    all_shots_per_60.sort()
-    all_distance_per_game.sort()
+    # 7. Collect distance values for percentile calculation (shots/60 was
+    # collected alongside the other traditional populations in step 4)
+    all_distance_per_game = np.sort(np.array([
+        edge.distance_per_game_miles
+        for edge in edge_stats.values()
+        if edge.distance_per_game_miles is not None
+    ], dtype=float))
 
     logger.info(f"Shots/60 samples: {len(all_shots_per_60)}, Dist/G samples: {len(all_distance_per_game)}")
 
-    # 8. Save Edge stats with calculated percentiles
-    players_updated = 0
-    for player in all_skaters:
-        player_id = player["player_id"]
-
-        if player_id in edge_stats:
-            edge = edge_stats[player_id]
-            trad = trad_stats.get(player_id, {})
+    # 8. Save Edge stats with calculated percentiles in one batched write
+    for player_id, edge in edge_stats.items():
+        trad = trad_stats.get(player_id)
 
-            # Calculate shots percentile
-            shots_per_60 = trad.get("shots_per_60")
-            if shots_per_60 is not None and all_shots_per_60:
-                edge["shots_percentile"] = calculate_percentile(shots_per_60, all_shots_per_60)
+        # Calculate shots percentile
+        shots_per_60 = trad.shots_per_60 if trad is not None else None
+        if shots_per_60 is not None and len(all_shots_per_60):
+            edge.shots_percentile = calculate_percentile(shots_per_60, all_shots_per_60)
 
-            # Calculate distance per game percentile (override NHL's total distance percentile)
-            dist_per_game = edge.get("distance_per_game_miles")
-            if dist_per_game is not None and all_distance_per_game:
-                edge["distance_percentile"] = calculate_percentile(dist_per_game, all_distance_per_game)
+        # Calculate distance per game percentile (override NHL's total distance percentile)
+        if edge.distance_per_game_miles is not None and len(all_distance_per_game):
+            edge.distance_percentile = calculate_percentile(edge.distance_per_game_miles,
+                                                            all_distance_per_game)
 
-            database.upsert_player_edge_stats(player_id, edge)
-            players_updated += 1
+    database.upsert_player_edge_stats_bulk(
+        [(player_id, asdict(edge)) for player_id, edge in edge_stats.items()])
+    players_updated = len(edge_stats)
 
     # 9. Fetch and save all goalies
     logger.info("Fetching goalie data...")
@@ -987,15 +1120,18 @@ def refresh_data():
             if goalie.get("save_pct") is not None:
                 all_save_pct.append(goalie["save_pct"])
 
-        # Sort for percentile calculation
-        all_gaa.sort()
-        all_save_pct.sort()
-        all_hdsv.sort()
+        # Sort each population into an ndarray once; the per-goalie
+        # percentile probes below then avoid re-converting the list on
+        # every call
+        all_gaa = np.sort(np.array(all_gaa, dtype=float))
+        all_save_pct = np.sort(np.array(all_save_pct, dtype=float))
+        all_hdsv = np.sort(np.array(all_hdsv, dtype=float))
 
         logger.info(f"GAA samples: {len(all_gaa)}, SV% samples: {len(all_save_pct)}, HDSV% samples: {len(all_hdsv)}")
 
-        # Second pass: save goalies with percentiles
+        # Second pass: save goalies with percentiles (shared timestamp)
         goalies_updated = 0
+        now_iso = datetime.now().isoformat()
         for goalie in all_goalies:
             stats = {
                 "games_played": goalie.get("games_played"),
@@ -1009,13 +1145,13 @@ def refresh_data():
             }
 
             # Calculate percentiles
-            if stats.get("goals_against_avg") is not None and all_gaa:
+            if stats.get("goals_against_avg") is not None and len(all_gaa):
                 # For GAA, lower is better, so invert the percentile (100 - pct)
                 raw_pct = calculate_percentile(stats["goals_against_avg"], all_gaa)
                 stats["gaa_percentile"] = (100 - raw_pct) if raw_pct is not None else None
-            if stats.get("save_pct") is not None and all_save_pct:
+            if stats.get("save_pct") is not None and len(all_save_pct):
                 stats["save_pct_percentile"] = calculate_percentile(stats["save_pct"], all_save_pct)
-            if stats.get("high_danger_save_pct") is not None and all_hdsv:
+            if stats.get("high_danger_save_pct") is not None and len(all_hdsv):
                 stats["hdsv_percentile"] = calculate_percentile(stats["high_danger_save_pct"], all_hdsv)
 
             database.upsert_goalie(
@@ -1023,7 +1159,8 @@ def refresh_data():
                 name=goalie["name"],
                 jersey_number=goalie.get("jersey_number"),
                 team_abbr=goalie.get("team_abbr"),
-                stats=stats
+                stats=stats,
+                now_iso=now_iso
             )
             goalies_updated += 1
 
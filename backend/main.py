@@ -4,7 +4,7 @@ import os
 from typing import Optional
 from fastapi import FastAPI, HTTPException, Header, BackgroundTasks, Query
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 from pathlib import Path
 
 from backend import database
@@ -21,7 +21,10 @@ API_REFRESH_KEY = os.environ.get("API_REFRESH_KEY", "dev-key-change-me")
 app = FastAPI(
     title="Edge Report API",
     description="NHL Edge stats in a comprehensive, sortable format",
-    version="2.0.0"
+    version="2.0.0",
+    # orjson serializes the big roster payloads several times faster than
+    # the stdlib encoder
+    default_response_class=ORJSONResponse
 )
 
 # Static files path
@@ -250,11 +253,8 @@ async def get_team_speed(team_abbr: str):
     all_teams = database.get_all_teams_speed_stats()
 
     # Find the requested team
-    team_stats = None
-    for team in all_teams:
-        if team["team_abbr"] == team_abbr.upper():
-            team_stats = team
-            break
+    teams_by_abbr = {team["team_abbr"]: team for team in all_teams}
+    team_stats = teams_by_abbr.get(team_abbr.upper())
 
     if not team_stats:
         raise HTTPException(status_code=404, detail="Team speed data not found")
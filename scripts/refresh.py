@@ -6,6 +6,7 @@ Called by cron or manually for data updates.
 
 import sys
 import os
+import time
 from datetime import datetime
 
 # Add parent directory to path for imports
@@ -15,14 +16,20 @@ from backend.fetcher import refresh_data
 
 
 def main():
-    print(f"[{datetime.now().isoformat()}] Starting Caps Edge data refresh...")
+    start = datetime.now()
+    t0 = time.perf_counter()
+    print(f"[{start.isoformat()}] Starting Caps Edge data refresh...")
 
     try:
         players_updated = refresh_data()
-        print(f"[{datetime.now().isoformat()}] Refresh complete. Updated {players_updated} players.")
+        elapsed = time.perf_counter() - t0
+        print(f"[{datetime.now().isoformat()}] Refresh complete in {elapsed:.2f}s. "
+              f"Updated {players_updated} players.")
         return 0
     except Exception as e:
-        print(f"[{datetime.now().isoformat()}] ERROR: Refresh failed - {e}")
+        elapsed = time.perf_counter() - t0
+        print(f"[{datetime.now().isoformat()}] ERROR: Refresh failed "
+              f"after {elapsed:.2f}s - {e}")
         return 1
 
 